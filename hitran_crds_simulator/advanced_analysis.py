@@ -5,14 +5,56 @@ Advanced Analysis Tools
 - Uncertainty analysis
 """
 
+import math
+import re
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 from scipy import optimize, stats
-from scipy.interpolate import interp1d
+from scipy.cluster.vq import kmeans2
 import warnings
 warnings.filterwarnings('ignore')
 
+# Optional JIT compiler for the fused noise kernel
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Column-name patterns for experimental CSV headers
+_WL_RE = re.compile(r'wave|nm|lambda', re.I)
+_ABS_RE = re.compile(r'abs|intensity|trans', re.I)
+
+# Above this mean count the Poisson distribution is replaced by its Gaussian limit
+SHOT_NOISE_GAUSSIAN_THRESHOLD = 30
+
+# Errors a spectrum function may legitimately raise for an unphysical sample;
+# anything else is a bug and propagates
+SAMPLE_ERRORS = (ValueError, ArithmeticError)
+
+def _evaluate_sample(spectrum_function, wavelength, params):
+    """Evaluate one Monte Carlo sample, returning (spectrum, error)"""
+    try:
+        return spectrum_function(wavelength, **params), None
+    except SAMPLE_ERRORS as e:
+        return None, e
+
+if njit is not None:
+    @njit(fastmath=True, cache=True)
+    def _fused_noise(spectrum, wavelength, noise_gauss, noise_shot, drift_amp, drift_freq,
+                     spike_positions, spike_values, out, baseline, spikes):
+        """Sum all noise components into out in one pass, then scatter the spikes"""
+        wl_min = wavelength.min()
+        wl_span = wavelength.max() - wl_min
+        for i in range(spectrum.shape[0]):
+            drift = drift_amp * math.sin(2 * math.pi * drift_freq * (wavelength[i] - wl_min) / wl_span)
+            baseline[i] = drift
+            out[i] = spectrum[i] + noise_gauss[i] + noise_shot[i] + drift
+        for k in range(spike_positions.shape[0]):
+            out[spike_positions[k]] += spike_values[k]
+            spikes[spike_positions[k]] += spike_values[k]
+else:
+    _fused_noise = None
+
 class ExperimentalDataAnalyzer:
     """Experimental data analysis and comparison"""
     
@@ -32,19 +74,17 @@ class ExperimentalDataAnalyzer:
         """
         if file_path:
             try:
-                data = pd.read_csv(file_path)
-                # Flexible column name handling
-                wavelength_col = None
-                absorption_col = None
-                
-                for col in data.columns:
-                    col_lower = col.lower()
-                    if 'wave' in col_lower or 'nm' in col_lower or 'lambda' in col_lower:
-                        wavelength_col = col
-                    elif 'abs' in col_lower or 'intensity' in col_lower or 'trans' in col_lower:
-                        absorption_col = col
+                # Flexible column name handling (header only)
+                columns = pd.read_csv(file_path, nrows=0).columns
+                wavelength_col = next(
+                    (col for col in columns if _WL_RE.search(str(col))), None)
+                absorption_col = next(
+                    (col for col in columns
+                     if _ABS_RE.search(str(col)) and not _WL_RE.search(str(col))), None)
                 
                 if wavelength_col and absorption_col:
+                    # Load only the two detected columns
+                    data = pd.read_csv(file_path, usecols=[wavelength_col, absorption_col])
                     self.experimental_data = {
                         'wavelength': data[wavelength_col].values,
                         'absorption': data[absorption_col].values
@@ -72,7 +112,13 @@ class ExperimentalDataAnalyzer:
             return False
     
     def interpolate_simulated_data(self, sim_wavelength, sim_absorption, experimental_wavelength):
-        """Interpolate simulation data to match experimental wavelength"""
+        """
+        Interpolate simulation data to match experimental wavelength
+        
+        Returns:
+            (overlapping experimental wavelengths, interpolated simulation,
+             boolean mask of the overlap on experimental_wavelength)
+        """
         try:
             # Find overlapping wavelength range
             min_wl = max(sim_wavelength.min(), experimental_wavelength.min())
@@ -84,28 +130,39 @@ class ExperimentalDataAnalyzer:
             
             if len(exp_wl_overlap) < 5:
                 print("❌ Overlapping wavelength range too small")
-                return None, None
+                return None, None, None
             
-            # Interpolate simulation data
-            interp_func = interp1d(sim_wavelength, sim_absorption, kind='linear', 
-                                 bounds_error=False, fill_value='extrapolate')
-            sim_interpolated = interp_func(exp_wl_overlap)
+            # np.interp needs ascending x (grids converted from wavenumber are descending)
+            if sim_wavelength[0] > sim_wavelength[-1]:
+                sim_wavelength = sim_wavelength[::-1]
+                sim_absorption = sim_absorption[::-1]
+
+            # Interpolate simulation data (points are inside the overlap, so no extrapolation)
+            sim_interpolated = np.interp(exp_wl_overlap, sim_wavelength, sim_absorption)
             
             print(f"✅ Data interpolation complete: {len(exp_wl_overlap)} points for comparison")
-            return exp_wl_overlap, sim_interpolated
+            return exp_wl_overlap, sim_interpolated, exp_mask
             
         except Exception as e:
             print(f"❌ Data interpolation failed: {e}")
-            return None, None
+            return None, None, None
     
-    def fit_scaling_factor(self, sim_wavelength, sim_absorption):
-        """Fit scaling factor to match experimental data"""
+    def fit_scaling_factor(self, sim_wavelength, sim_absorption, method='closed_form'):
+        """
+        Fit scaling factor to match experimental data
+        
+        Args:
+            sim_wavelength: simulated wavelength array (nm)
+            sim_absorption: simulated absorption array
+            method: 'closed_form' (normal equations) or 'least_squares'
+                    (Levenberg-Marquardt with analytic Jacobian)
+        """
         if self.experimental_data is None:
             print("❌ No experimental data available")
             return None
         
         # Data interpolation
-        exp_wl, sim_interp = self.interpolate_simulated_data(
+        exp_wl, sim_interp, exp_mask = self.interpolate_simulated_data(
             sim_wavelength, sim_absorption, self.experimental_data['wavelength']
         )
         
@@ -113,39 +170,49 @@ class ExperimentalDataAnalyzer:
             return None
         
         # Extract experimental data (overlapping region)
-        exp_mask = (self.experimental_data['wavelength'] >= exp_wl.min()) & \
-                   (self.experimental_data['wavelength'] <= exp_wl.max())
         exp_abs = self.experimental_data['absorption'][exp_mask]
         
         # Fit scaling factor (y = a*x + b)
-        def fit_function(params, sim_data, exp_data):
-            scale, offset = params
-            fitted = scale * sim_data + offset
-            return np.sum((fitted - exp_data)**2)
-        
-        # Initial estimates
-        initial_scale = np.mean(exp_abs) / np.mean(sim_interp) if np.mean(sim_interp) != 0 else 1.0
-        initial_offset = np.mean(exp_abs) - initial_scale * np.mean(sim_interp)
-        
-        # Optimization
-        result = optimize.minimize(
-            fit_function, 
-            [initial_scale, initial_offset],
-            args=(sim_interp, exp_abs),
-            method='Nelder-Mead'
-        )
-        
-        if result.success:
+        n = sim_interp.size
+        sum_x = sim_interp.sum()
+        sum_y = exp_abs.sum()
+        
+        if method == 'least_squares':
+            # Gradient-based fit; the Jacobian of an affine model is constant
+            jacobian = np.column_stack([sim_interp, np.ones_like(sim_interp)])
+            initial_scale = sum_y / sum_x if sum_x != 0 else 1.0
+            initial_offset = (sum_y - initial_scale * sum_x) / n
+            
+            result = optimize.least_squares(
+                lambda params: params[0] * sim_interp + params[1] - exp_abs,
+                [initial_scale, initial_offset],
+                jac=lambda params: jacobian,
+                method='lm'
+            )
+            fit_ok = result.success
             scale, offset = result.x
+        else:
+            # Linear model -> closed-form least squares via 2x2 normal equations
+            sum_xx = sim_interp @ sim_interp
+            sum_xy = sim_interp @ exp_abs
+            denominator = n * sum_xx - sum_x * sum_x
+            fit_ok = denominator != 0
+            if fit_ok:
+                scale = (n * sum_xy - sum_x * sum_y) / denominator
+                offset = (sum_y - scale * sum_x) / n
+
+        if fit_ok:
             fitted_absorption = scale * sim_interp + offset
             
-            # Calculate R²
-            ss_res = np.sum((exp_abs - fitted_absorption)**2)
-            ss_tot = np.sum((exp_abs - np.mean(exp_abs))**2)
+            # Calculate R² (sums of squares as dot products, no squared temporaries)
+            residual = exp_abs - fitted_absorption
+            deviation = exp_abs - sum_y / n
+            ss_res = residual @ residual
+            ss_tot = deviation @ deviation
             r_squared = 1 - (ss_res / ss_tot) if ss_tot != 0 else 0
-            
+
             # RMS error
-            rmse = np.sqrt(np.mean((exp_abs - fitted_absorption)**2))
+            rmse = np.sqrt(ss_res / n)
             
             self.fitted_params = {
                 'scale': scale,
@@ -174,6 +241,9 @@ class ExperimentalDataAnalyzer:
             print("❌ No fitting data available")
             return
         
+        # matplotlib is only needed for these static plots
+        import matplotlib.pyplot as plt
+        
         plt.figure(figsize=(12, 8))
         
         # Full experimental data
@@ -209,22 +279,34 @@ class ExperimentalDataAnalyzer:
 class NoiseSimulator:
     """Noise simulation"""
     
+    # Every method takes an optional rng (np.random.Generator); None draws from a
+    # fresh unseeded generator. Callers that need reproducibility pass their own.
+    
     @staticmethod
-    def add_gaussian_noise(spectrum, snr_db):
+    def add_gaussian_noise(spectrum, snr_db, rng=None):
         """Add Gaussian noise"""
+        rng = np.random.default_rng(rng)
         signal_power = np.mean(spectrum**2)
         snr_linear = 10**(snr_db/10)
         noise_power = signal_power / snr_linear
-        noise = np.random.normal(0, np.sqrt(noise_power), len(spectrum))
+        noise = rng.normal(0, np.sqrt(noise_power), len(spectrum))
         return spectrum + noise, noise
     
     @staticmethod
-    def add_shot_noise(spectrum, photon_count_factor=1000):
+    def add_shot_noise(spectrum, photon_count_factor=1000, rng=None):
         """Add shot noise (Poisson noise)"""
+        rng = np.random.default_rng(rng)
         # Convert spectrum to photon counts
         photon_counts = spectrum * photon_count_factor
-        # Apply Poisson noise
-        noisy_counts = np.random.poisson(np.maximum(photon_counts, 0))
+        np.maximum(photon_counts, 0, out=photon_counts)
+        
+        # Apply Poisson noise (Gaussian approximation for bright points)
+        bright = photon_counts > SHOT_NOISE_GAUSSIAN_THRESHOLD
+        noisy_counts = np.where(
+            bright,
+            photon_counts + np.sqrt(photon_counts) * rng.standard_normal(photon_counts.shape),
+            rng.poisson(np.where(bright, 0, photon_counts))
+        )
         # Convert back to spectrum
         noisy_spectrum = noisy_counts / photon_count_factor
         noise = noisy_spectrum - spectrum
@@ -239,33 +321,38 @@ class NoiseSimulator:
         return spectrum + baseline, baseline
     
     @staticmethod
-    def add_spikes(spectrum, wavelength, num_spikes=5, spike_amplitude=0.1):
+    def add_spikes(spectrum, wavelength, num_spikes=5, spike_amplitude=0.1, rng=None):
         """Add spike noise"""
-        noisy_spectrum = spectrum.copy()
-        spike_positions = np.random.randint(0, len(spectrum), num_spikes)
-        spike_values = np.random.normal(0, spike_amplitude, num_spikes)
-        
+        rng = np.random.default_rng(rng)
+        spike_positions = rng.integers(0, len(spectrum), num_spikes)
+        spike_values = rng.normal(0, spike_amplitude, num_spikes)
+
+        # Scatter-add so repeated positions accumulate
         spikes = np.zeros_like(spectrum)
-        for pos, val in zip(spike_positions, spike_values):
-            noisy_spectrum[pos] += val
-            spikes[pos] = val
-        
+        np.add.at(spikes, spike_positions, spike_values)
+        noisy_spectrum = spectrum + spikes
+
         return noisy_spectrum, spikes
     
     @staticmethod
     def simulate_realistic_noise(spectrum, wavelength, snr_db=30, include_shot=True, 
-                                include_baseline=True, include_spikes=True):
+                                include_baseline=True, include_spikes=True, rng=None):
         """Realistic composite noise simulation"""
-        noisy_spectrum = spectrum.copy()
+        rng = np.random.default_rng(rng)
+        if _fused_noise is not None:
+            return NoiseSimulator._simulate_realistic_noise_fused(
+                spectrum, wavelength, snr_db, include_shot, include_baseline, include_spikes, rng
+            )
+        
         noise_components = {}
         
-        # Gaussian noise
-        noisy_spectrum, gaussian_noise = NoiseSimulator.add_gaussian_noise(noisy_spectrum, snr_db)
+        # Gaussian noise (each step returns a new array, so no up-front copy is needed)
+        noisy_spectrum, gaussian_noise = NoiseSimulator.add_gaussian_noise(spectrum, snr_db, rng)
         noise_components['gaussian'] = gaussian_noise
         
         # Shot noise
         if include_shot:
-            noisy_spectrum, shot_noise = NoiseSimulator.add_shot_noise(noisy_spectrum)
+            noisy_spectrum, shot_noise = NoiseSimulator.add_shot_noise(noisy_spectrum, rng=rng)
             noise_components['shot'] = shot_noise
         
         # Baseline drift
@@ -279,11 +366,53 @@ class NoiseSimulator:
         if include_spikes:
             noisy_spectrum, spikes = NoiseSimulator.add_spikes(
                 noisy_spectrum, wavelength, num_spikes=3, 
-                spike_amplitude=np.max(spectrum)*0.05
+                spike_amplitude=np.max(spectrum)*0.05, rng=rng
             )
             noise_components['spikes'] = spikes
         
         return noisy_spectrum, noise_components
+    
+    @staticmethod
+    def _simulate_realistic_noise_fused(spectrum, wavelength, snr_db, include_shot,
+                                        include_baseline, include_spikes, rng):
+        """simulate_realistic_noise with random draws in NumPy and one fused Numba pass"""
+        spectrum = np.ascontiguousarray(spectrum, dtype=np.float64)
+        wavelength = np.ascontiguousarray(wavelength, dtype=np.float64)
+        noise_components = {}
+        
+        # Gaussian noise
+        noise_power = np.mean(spectrum**2) / 10**(snr_db/10)
+        gaussian_noise = rng.normal(0, np.sqrt(noise_power), len(spectrum))
+        noise_components['gaussian'] = gaussian_noise
+        
+        # Shot noise acts on the spectrum after Gaussian noise
+        if include_shot:
+            _, shot_noise = NoiseSimulator.add_shot_noise(spectrum + gaussian_noise, rng=rng)
+            noise_components['shot'] = shot_noise
+        else:
+            shot_noise = np.zeros_like(spectrum)
+        
+        drift_amplitude = np.max(spectrum)*0.02 if include_baseline else 0.0
+        
+        if include_spikes:
+            spike_positions = rng.integers(0, len(spectrum), 3)
+            spike_values = rng.normal(0, np.max(spectrum)*0.05, 3)
+        else:
+            spike_positions = np.empty(0, dtype=np.int64)
+            spike_values = np.empty(0)
+        
+        noisy_spectrum = np.empty_like(spectrum)
+        baseline_drift = np.empty_like(spectrum)
+        spikes = np.zeros_like(spectrum)
+        _fused_noise(spectrum, wavelength, gaussian_noise, shot_noise, drift_amplitude, 1.0,
+                     spike_positions, spike_values, noisy_spectrum, baseline_drift, spikes)
+        
+        if include_baseline:
+            noise_components['baseline'] = baseline_drift
+        if include_spikes:
+            noise_components['spikes'] = spikes
+        
+        return noisy_spectrum, noise_components
 
 class UncertaintyAnalyzer:
     """Uncertainty analysis"""
@@ -291,7 +420,7 @@ class UncertaintyAnalyzer:
     def __init__(self):
         self.monte_carlo_results = None
     
-    def parameter_uncertainty_propagation(self, base_params, uncertainties, num_samples=1000):
+    def parameter_uncertainty_propagation(self, base_params, uncertainties, num_samples=1000, rng=None):
         """
         Parameter uncertainty propagation analysis
         
@@ -299,18 +428,24 @@ class UncertaintyAnalyzer:
             base_params: base parameter dictionary
             uncertainties: uncertainty for each parameter (standard deviation)
             num_samples: number of Monte Carlo samples
+            rng: np.random.Generator to draw from (None = fresh unseeded generator)
+        
+        Parameters without an uncertainty are returned as read-only
+        broadcast views of their base value.
         """
-        results = []
+        rng = np.random.default_rng(rng)
         param_samples = {}
         
-        # Normal distribution sampling for each parameter
+        # One standard-normal block for all uncertain parameters, then scale
+        uncertain_params = [param for param in base_params if param in uncertainties]
+        standard_normal = rng.standard_normal((len(uncertain_params), num_samples))
+        
+        rows = iter(standard_normal)
         for param, base_value in base_params.items():
             if param in uncertainties:
-                uncertainty = uncertainties[param]
-                samples = np.random.normal(base_value, uncertainty, num_samples)
-                param_samples[param] = samples
+                param_samples[param] = base_value + uncertainties[param] * next(rows)
             else:
-                param_samples[param] = np.full(num_samples, base_value)
+                param_samples[param] = np.broadcast_to(base_value, (num_samples,))
         
         print(f"🎲 Monte Carlo simulation started: {num_samples} samples")
         
@@ -323,7 +458,8 @@ class UncertaintyAnalyzer:
         
         return param_samples
     
-    def calculate_spectrum_uncertainty(self, spectrum_function, wavelength, param_samples):
+    def calculate_spectrum_uncertainty(self, spectrum_function, wavelength, param_samples, n_jobs=1,
+                                       warm_start=False, verbose=True, rng=None):
         """
         Calculate spectrum uncertainty
         
@@ -331,15 +467,58 @@ class UncertaintyAnalyzer:
             spectrum_function: spectrum calculation function
             wavelength: wavelength array
             param_samples: parameter samples
+            n_jobs: worker processes for independent samples (joblib, -1 = all cores)
+            warm_start: treat spectrum_function as a fitter called as
+                fitter(wavelength, prior=..., **params) -> (spectrum, fit_result);
+                samples are k-means clustered and each cluster's centroid fit
+                is passed as the prior for its members
+            verbose: print progress and per-sample failures
+            rng: np.random.Generator seeding the warm-start clustering
         """
         num_samples = len(list(param_samples.values())[0])
-        spectra = np.zeros((num_samples, len(wavelength)))
+        # Failed rows are tracked in valid_mask and never read, so no zero-fill.
+        # float32 storage halves memory traffic; statistics accumulate in float64.
+        spectra = np.empty((num_samples, len(wavelength)), dtype=np.float32)
+        valid_mask = np.ones(num_samples, dtype=bool)
         
         print("📊 Calculating spectrum uncertainty...")
         
+        if warm_start:
+            self._fit_with_cluster_priors(spectrum_function, wavelength, param_samples,
+                                          spectra, valid_mask, rng, verbose)
+            return self._summarize_spectra(wavelength, spectra, valid_mask)
+        
+        if n_jobs != 1:
+            try:
+                from joblib import Parallel, delayed
+            except ImportError:
+                print("   joblib not installed, running samples serially")
+                n_jobs = 1
+        
+        if n_jobs != 1:
+            # Samples are independent: farm them out to worker processes
+            results = Parallel(n_jobs=n_jobs, backend='loky')(
+                delayed(_evaluate_sample)(
+                    spectrum_function, wavelength,
+                    {param: samples[i] for param, samples in param_samples.items()}
+                )
+                for i in range(num_samples)
+            )
+            
+            for i, (spectrum, error) in enumerate(results):
+                if error is None:
+                    spectra[i] = spectrum
+                else:
+                    if verbose:
+                        print(f"   Sample {i} calculation failed: {error}")
+                    valid_mask[i] = False
+            
+            return self._summarize_spectra(wavelength, spectra, valid_mask)
+        
         # Calculate spectrum for each sample
+        progress_step = max(1, num_samples // 10)
         for i in range(num_samples):
-            if i % (num_samples // 10) == 0:
+            if verbose and i % progress_step == 0:
                 print(f"   Progress: {i/num_samples*100:.0f}%")
             
             # Current sample parameters
@@ -349,28 +528,107 @@ class UncertaintyAnalyzer:
                 # Calculate spectrum
                 spectrum = spectrum_function(wavelength, **current_params)
                 spectra[i] = spectrum
-            except Exception as e:
-                print(f"   Sample {i} calculation failed: {e}")
-                spectra[i] = np.nan
+            except SAMPLE_ERRORS as e:
+                if verbose:
+                    print(f"   Sample {i} calculation failed: {e}")
+                valid_mask[i] = False
         
-        # Statistical calculation
-        valid_spectra = spectra[~np.isnan(spectra).any(axis=1)]
+        return self._summarize_spectra(wavelength, spectra, valid_mask)
+    
+    def calculate_spectrum_uncertainty_vectorized(self, spectrum_function, wavelength, param_samples):
+        """
+        Calculate spectrum uncertainty with a single broadcast call
+        
+        spectrum_function must broadcast: it is called once with wavelength
+        shaped (1, N) and every parameter shaped (num_samples, 1), and must
+        return a (num_samples, N) array. Functions that do not broadcast
+        (ValueError/TypeError) fall back to calculate_spectrum_uncertainty.
+        
+        Args:
+            spectrum_function: broadcastable spectrum calculation function
+            wavelength: wavelength array
+            param_samples: parameter samples
+        """
+        wavelength = np.asarray(wavelength)
+        num_samples = len(list(param_samples.values())[0])
+        
+        print("📊 Calculating spectrum uncertainty (vectorized)...")
+        
+        try:
+            spectra = spectrum_function(
+                wavelength[None, :],
+                **{param: np.asarray(samples)[:, None] for param, samples in param_samples.items()}
+            )
+            spectra = np.broadcast_to(spectra, (num_samples, len(wavelength)))
+        except (ValueError, TypeError) as e:
+            # Only shape/broadcast failures fall back; other errors are real bugs and propagate
+            print(f"   Vectorized evaluation failed ({e}), falling back to per-sample loop")
+            return self.calculate_spectrum_uncertainty(spectrum_function, wavelength, param_samples)
+        
+        return self._summarize_spectra(wavelength, spectra)
+    
+    def _fit_with_cluster_priors(self, fitter, wavelength, param_samples, spectra, valid_mask, rng=None,
+                                 verbose=True):
+        """Fit cluster centroids first, then warm-start each member from its centroid"""
+        param_names = list(param_samples)
+        param_matrix = np.column_stack([np.asarray(param_samples[param], dtype=float)
+                                        for param in param_names])
+        num_samples = len(param_matrix)
+        num_clusters = min(max(5, num_samples // 50), num_samples)
+        
+        # Cluster in standardized parameter space
+        scale = param_matrix.std(axis=0)
+        scale[scale == 0] = 1.0
+        centroids, labels = kmeans2(param_matrix / scale, num_clusters, minit='++', seed=np.random.default_rng(rng))
+        centroids *= scale
+        
+        if verbose:
+            print(f"   Fitting {num_clusters} cluster centroids as priors")
+        priors = []
+        for centroid in centroids:
+            try:
+                _, fit_result = fitter(wavelength, prior=None, **dict(zip(param_names, centroid)))
+            except SAMPLE_ERRORS as e:
+                if verbose:
+                    print(f"   Centroid fit failed: {e}")
+                fit_result = None
+            priors.append(fit_result)
+        
+        for i in range(num_samples):
+            current_params = {param: samples[i] for param, samples in param_samples.items()}
+            try:
+                spectrum, _ = fitter(wavelength, prior=priors[labels[i]], **current_params)
+                spectra[i] = spectrum
+            except SAMPLE_ERRORS as e:
+                if verbose:
+                    print(f"   Sample {i} calculation failed: {e}")
+                valid_mask[i] = False
+    
+    def _summarize_spectra(self, wavelength, spectra, valid_mask=None):
+        """Mean, standard deviation and confidence interval over sampled spectra"""
+        num_samples = len(spectra)
+        
+        # Statistical calculation (only copy the rows when some samples failed)
+        if valid_mask is None or valid_mask.all():
+            valid_spectra = spectra
+        else:
+            valid_spectra = spectra[valid_mask]
         
         if len(valid_spectra) == 0:
             print("❌ No valid spectra available")
             return None
         
-        mean_spectrum = np.mean(valid_spectra, axis=0)
-        std_spectrum = np.std(valid_spectra, axis=0)
+        mean_spectrum = np.mean(valid_spectra, axis=0, dtype=np.float64)
+        std_spectrum = np.std(valid_spectra, axis=0, dtype=np.float64)
         
         # Confidence interval calculation (95%)
         confidence_level = 0.95
         alpha = 1 - confidence_level
-        lower_percentile = (alpha/2) * 100
-        upper_percentile = (1 - alpha/2) * 100
         
-        confidence_lower = np.percentile(valid_spectra, lower_percentile, axis=0)
-        confidence_upper = np.percentile(valid_spectra, upper_percentile, axis=0)
+        # Both bounds from a single partition along the sample axis
+        confidence_lower, confidence_upper = np.quantile(
+            valid_spectra, [alpha/2, 1 - alpha/2], axis=0
+        )
         
         uncertainty_results = {
             'wavelength': wavelength,
@@ -400,6 +658,8 @@ class UncertaintyAnalyzer:
         conf_upper = uncertainty_results['confidence_upper']
         conf_level = uncertainty_results['confidence_level']
         
+        import matplotlib.pyplot as plt
+        
         plt.figure(figsize=(12, 10))
         
         # Main spectrum and uncertainty
@@ -443,6 +703,8 @@ class UncertaintyAnalyzer:
 
 # Test and examples
 if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+    
     print("=== Advanced Analysis Tools Test ===")
     
     # Generate example data
@@ -498,8 +760,15 @@ if __name__ == "__main__":
     
     print("\n3️⃣ Uncertainty Analysis Test")
     
-    # Define simple spectrum function
+    # Define simple spectrum function (numexpr fuses the expression when available)
+    try:
+        import numexpr as ne
+    except ImportError:
+        ne = None
+    
     def simple_spectrum_function(wl, amplitude=0.1, center=1510, width=20, baseline=0.02):
+        if ne is not None:
+            return ne.evaluate('amplitude * exp(-(wl - center)**2 / width) + baseline')
         return amplitude * np.exp(-((wl - center)**2) / width) + baseline
     
     # Define parameters and uncertainties
@@ -525,7 +794,7 @@ if __name__ == "__main__":
     )
     
     # Calculate spectrum uncertainty
-    uncertainty_results = uncertainty_analyzer.calculate_spectrum_uncertainty(
+    uncertainty_results = uncertainty_analyzer.calculate_spectrum_uncertainty_vectorized(
         simple_spectrum_function, wavelength, param_samples
     )
     
@@ -6,10 +6,8 @@ Advanced spectral analysis tool with optimization and uncertainty analysis
 import streamlit as st
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
+from plotly.colors import qualitative
 import sys
 import os
 
@@ -20,7 +18,7 @@ sys.path.append('data_handler')
 # Import our modules
 try:
     from data_handler.optimized_hitran_api import MemoryOptimizedHitranAPI
-    from advanced_analysis import ExperimentalDataAnalyzer, NoiseSimulator, UncertaintyAnalyzer
+    from _kernels import _lorentzian_sum, _gauss_mc, trapz_rows, warmup as warmup_kernels
 except ImportError as e:
     st.error(f"Module import error: {e}")
     st.error("Please ensure all required files are in the correct directories")
@@ -67,6 +65,13 @@ st.markdown("""
 # Initialize session state
 if 'hitran_api' not in st.session_state:
     st.session_state.hitran_api = MemoryOptimizedHitranAPI()
+if 'rng' not in st.session_state:
+    # One seeded generator per session for all placeholder spectra
+    st.session_state.rng = np.random.default_rng(0)
+if 'kernels_ready' not in st.session_state:
+    # Pay the JIT compile cost at startup rather than on the first simulation
+    warmup_kernels()
+    st.session_state.kernels_ready = True
 
 # Title and description
 st.markdown('<h1 class="main-header">🔬 HITRAN CRDS Simulator</h1>', unsafe_allow_html=True)
@@ -94,6 +99,14 @@ page = st.sidebar.selectbox(
     ]
 )
 
+# Plot palettes
+GAS_PALETTE = qualitative.Set1
+NOISE_COLORS = ['cyan', 'orange', 'green', 'purple']
+
+# Line-shape settings for calculate_absorption_spectrum
+LINE_WIDTH_NM = 0.1  # Simplified Lorentzian half-width
+LINE_CUTOFF_NM = 0.1  # Lines farther than this from a grid point are ignored
+
 # Helper functions
 @st.cache_data
 def get_molecule_data(molecule, wl_min, wl_max):
@@ -107,30 +120,172 @@ def get_molecule_data(molecule, wl_min, wl_max):
         st.error(f"Error downloading data: {e}")
         return None
 
-def calculate_absorption_spectrum(data, wavelength, temperature=296, pressure=1013.25, path_length=1.0):
-    """Calculate absorption spectrum from HITRAN data"""
+@st.cache_data
+def wavelength_grid(wl_min, wl_max, n=1000):
+    """Cached wavelength grid (st.cache_data hands each caller its own copy)"""
+    return np.linspace(wl_min, wl_max, n)
+
+@st.cache_data
+def clean_gauss_spectrum(wl_min, wl_max, n=1000):
+    """Cached example spectrum for the noise page"""
+    wavelength = wavelength_grid(wl_min, wl_max, n)
+    clean_spectrum = 0.1 * np.exp(-((wavelength - np.mean(wavelength))**2) / 20) + 0.02
+    return wavelength, clean_spectrum
+
+@st.cache_data
+def noise_realization(wl_min, wl_max, snr_db, include_shot, include_baseline, include_spikes, seed):
+    """Cached noisy spectrum; the seed makes each input combination map to one realization"""
+    from advanced_analysis import NoiseSimulator
+    
+    wavelength, clean_spectrum = clean_gauss_spectrum(wl_min, wl_max)
+    return NoiseSimulator.simulate_realistic_noise(
+        clean_spectrum, wavelength, snr_db=snr_db,
+        include_shot=include_shot,
+        include_baseline=include_baseline,
+        include_spikes=include_spikes,
+        rng=np.random.default_rng(seed)
+    )
+
+def build_noise_figure():
+    """Noise page layout with placeholder traces, built once per session"""
+    from plotly.subplots import make_subplots
+    
+    fig = make_subplots(
+        rows=2, cols=1,
+        subplot_titles=('Spectrum with Noise', 'Noise Components'),
+        vertical_spacing=0.15
+    )
+    
+    traces = [
+        go.Scatter(mode='lines', name='Clean Spectrum', line=dict(color='blue', width=2)),
+        go.Scatter(mode='lines', name='Noisy Spectrum', line=dict(color='red', width=1))
+    ]
+    traces += [go.Scatter(mode='lines', line=dict(color=color)) for color in NOISE_COLORS]
+    fig.add_traces(traces, rows=[1, 1] + [2] * len(NOISE_COLORS), cols=[1] * len(traces))
+    
+    fig.update_xaxes(title_text="Wavelength (nm)", row=2, col=1)
+    fig.update_yaxes(title_text="Absorption", row=1, col=1)
+    fig.update_yaxes(title_text="Noise Magnitude", row=2, col=1)
+    
+    fig.update_layout(height=700)
+    return fig
+
+def build_uncertainty_figure():
+    """Uncertainty page layout with placeholder traces, built once per session"""
+    from plotly.subplots import make_subplots
+    
+    fig = make_subplots(
+        rows=3, cols=1,
+        subplot_titles=('Spectrum with Confidence Interval', 
+                      'Absolute Uncertainty', 'Relative Uncertainty (%)'),
+        vertical_spacing=0.08
+    )
+    
+    traces = [
+        # Main spectrum with confidence interval
+        go.Scatter(
+            mode='lines',
+            line=dict(color='rgba(0,0,0,0)'),
+            showlegend=False,
+            hoverinfo='skip'
+        ),
+        go.Scatter(
+            mode='lines',
+            line=dict(color='rgba(0,0,0,0)'),
+            fill='tonexty',
+            fillcolor='rgba(0,100,80,0.3)',
+            name='95% Confidence Interval'
+        ),
+        go.Scatter(
+            mode='lines',
+            name='Mean Spectrum',
+            line=dict(color='blue', width=2)
+        ),
+        # Standard deviation
+        go.Scatter(
+            mode='lines',
+            name='Standard Deviation',
+            line=dict(color='red', width=2),
+            showlegend=False
+        ),
+        # Relative uncertainty
+        go.Scatter(
+            mode='lines',
+            name='Relative Uncertainty',
+            line=dict(color='green', width=2),
+            showlegend=False
+        )
+    ]
+    fig.add_traces(traces, rows=[1, 1, 1, 2, 3], cols=[1] * len(traces))
+    
+    fig.update_xaxes(title_text="Wavelength (nm)", row=3, col=1)
+    fig.update_yaxes(title_text="Absorption", row=1, col=1)
+    fig.update_yaxes(title_text="Std Dev", row=2, col=1)
+    fig.update_yaxes(title_text="Rel. Unc. (%)", row=3, col=1)
+    
+    fig.update_layout(height=800)
+    return fig
+
+@st.cache_resource
+def get_spectrum_calculator():
+    """Shared SpectrumCalculator, so its unit line-sum cache persists across reruns"""
+    from spectrum_calc.absorption import SpectrumCalculator
+    return SpectrumCalculator()
+
+def calculate_absorption_spectrum(data, wavelength, temperature=296, pressure=1013.25, path_length=1.0,
+                                  molecule=None):
+    """
+    Calculate absorption spectrum from HITRAN data (a LineSoA; float64 nu, float32 line parameters)
+    
+    The LineSoA is stored sorted by wavelength with centers_nm precomputed, so
+    no conversion or sort happens here. With molecule given, the Voigt profile
+    (Doppler + pressure broadening) comes from SpectrumCalculator and the result
+    is the optical depth; otherwise the simplified fixed-width Lorentzian is used.
+    """
     if data is None or len(data) == 0:
         return np.zeros_like(wavelength)
     
     # Simple absorption calculation (Beer-Lambert law)
     # This is a simplified version - real implementation would be more complex
-    absorption = np.zeros_like(wavelength)
+    wavelength = np.asarray(wavelength, dtype=np.float64)
+    # Centers stay float64 so grid offsets keep their precision; line parameters are float32
+    line_centers, line_strength = data.centers_nm, data.sw
     
-    for i, wl in enumerate(wavelength):
-        wavenumber = 1e7 / wl  # Convert nm to cm^-1
-        
-        # Find nearby transitions
-        line_centers = 1e7 / data['nu']  # Convert to nm
-        nearby_lines = np.abs(line_centers - wl) < 0.1  # Within 0.1 nm
-        
-        if np.any(nearby_lines):
-            # Simple Lorentzian line shape
-            line_strength = data['sw'][nearby_lines].sum()
-            line_width = 0.1  # Simplified
-            
-            absorption[i] = line_strength * path_length / (1 + ((wl - wl) / line_width)**2)
+    if molecule is not None:
+        # SpectrumCalculator works on an ascending wavenumber grid in atm; flip back to wavelength order
+        spectrum = get_spectrum_calculator().calculate_absorption_spectrum(
+            data, 1e7 / wavelength[::-1], temperature=temperature, pressure=pressure / 1013.25,
+            concentration=1.0, path_length=path_length, molecule=molecule
+        )
+        return (spectrum['absorption_coeff'] * path_length)[::-1]
+    
+    if _lorentzian_sum is not None:
+        return _lorentzian_sum(wavelength, line_centers, line_strength,
+                               LINE_WIDTH_NM, path_length, LINE_CUTOFF_NM)
+    
+    # Window of influence: lines strictly within 0.1 nm of each grid point
+    lo = np.searchsorted(line_centers, wavelength - LINE_CUTOFF_NM, side='right')
+    hi = np.searchsorted(line_centers, wavelength + LINE_CUTOFF_NM, side='left')
+    window = int((hi - lo).max())
+    if window <= 0:
+        return np.zeros_like(wavelength)
+    
+    # Gather each point's window into a (wavelength, window) band
+    idx = lo[:, None] + np.arange(window)
+    outside = idx >= hi[:, None]
+    idx = np.minimum(idx, len(line_centers) - 1)
+    
+    # Offsets from the first grid point keep float32 precise at ~1e3 nm magnitudes
+    origin = wavelength[0]
+    d = ((wavelength - origin).astype(np.float32)[:, None]
+         - (line_centers - origin).astype(np.float32)[idx])
+    
+    # Simple Lorentzian line shape
+    width_sq = np.float32(LINE_WIDTH_NM ** 2)
+    profile = width_sq / (width_sq + d * d)
+    profile[outside] = 0
     
-    return absorption
+    return (profile * line_strength[idx]).sum(axis=1, dtype=np.float64) * path_length
 
 # Page routing
 if page == "🏠 Home":
@@ -191,10 +346,13 @@ elif page == "📊 Basic Simulation":
                 st.success(f"✅ Downloaded {len(data)} spectral lines")
                 
                 # Generate wavelength array
-                wavelength = np.linspace(wl_min, wl_max, 1000)
+                wavelength = wavelength_grid(wl_min, wl_max)
                 
-                # Calculate absorption (simplified)
-                absorption = np.random.exponential(0.01, len(wavelength))  # Placeholder
+                # Voigt optical depth at the selected temperature, pressure and path length
+                absorption = calculate_absorption_spectrum(
+                    data, wavelength, temperature=temperature, pressure=pressure,
+                    path_length=path_length, molecule=molecule
+                )
                 
                 # Create interactive plot
                 fig = go.Figure()
@@ -258,10 +416,12 @@ elif page == "🧪 Mixed Gas Analysis":
     
     with col2:
         if analyze_btn:
+            from plotly.subplots import make_subplots
+            
             st.markdown("#### 📈 Mixed Spectrum Analysis")
             
             # Placeholder for mixed gas analysis
-            wavelength = np.linspace(wl_min, wl_max, 1000)
+            wavelength = wavelength_grid(wl_min, wl_max)
             
             fig = make_subplots(
                 rows=2, cols=1,
@@ -269,33 +429,34 @@ elif page == "🧪 Mixed Gas Analysis":
                 vertical_spacing=0.1
             )
             
-            total_absorption = np.zeros_like(wavelength)
-            colors = px.colors.qualitative.Set1
+            # Simulate individual absorption (placeholder): one draw for all gases
+            concentrations = np.array([gas['concentration'] / 1000 for gas in gas_configs])
+            absorption_stack = st.session_state.rng.exponential(0.01, size=(len(gas_configs), len(wavelength)))
+            individual = absorption_stack * concentrations[:, None]
+            # Concentration-weighted sum over gases as one (G,) @ (G, W) product
+            total_absorption = concentrations @ absorption_stack
+            palette = (GAS_PALETTE * (len(gas_configs) // len(GAS_PALETTE) + 1))[:len(gas_configs)]
             
-            for i, gas in enumerate(gas_configs):
-                # Simulate individual absorption (placeholder)
-                individual = np.random.exponential(0.01, len(wavelength)) * gas['concentration'] / 1000
-                total_absorption += individual
-                
-                fig.add_trace(
-                    go.Scatter(
-                        x=wavelength, y=individual,
-                        mode='lines',
-                        name=f"{gas['molecule']} ({gas['concentration']} ppm)",
-                        line=dict(color=colors[i % len(colors)])
-                    ),
-                    row=1, col=1
+            # Collect all traces and add them in one batch
+            traces = [
+                go.Scatter(
+                    x=wavelength, y=gas_absorption,
+                    mode='lines',
+                    name=f"{gas['molecule']} ({gas['concentration']} ppm)",
+                    line=dict(color=color)
                 )
-            
-            fig.add_trace(
+                for gas, gas_absorption, color in zip(gas_configs, individual, palette)
+            ]
+            traces.append(
                 go.Scatter(
                     x=wavelength, y=total_absorption,
                     mode='lines',
                     name='Total Mixture',
                     line=dict(color='black', width=3)
-                ),
-                row=2, col=1
+                )
             )
+            rows = [1] * len(gas_configs) + [2]
+            fig.add_traces(traces, rows=rows, cols=[1] * len(traces))
             
             fig.update_xaxes(title_text="Wavelength (nm)", row=2, col=1)
             fig.update_yaxes(title_text="Absorption", row=1, col=1)
@@ -303,6 +464,14 @@ elif page == "🧪 Mixed Gas Analysis":
             
             fig.update_layout(height=600, showlegend=True)
             st.plotly_chart(fig, use_container_width=True)
+            
+            # Band-integrated absorption per gas (trapezoid over the wavelength grid)
+            st.markdown("#### 📊 Integrated Absorption (nm)")
+            integrated = trapz_rows(individual, wavelength)
+            metric_cols = st.columns(len(gas_configs))
+            for col, gas, value in zip(metric_cols, gas_configs, integrated):
+                with col:
+                    st.metric(gas['molecule'], f"{value:.4f}")
 
 elif page == "🔊 Noise Simulation":
     st.markdown('<h2 class="sub-header">🔊 Noise Simulation</h2>', unsafe_allow_html=True)
@@ -321,59 +490,43 @@ elif page == "🔊 Noise Simulation":
         include_shot = st.checkbox("Include Shot Noise", value=True)
         include_baseline = st.checkbox("Include Baseline Drift", value=True)
         include_spikes = st.checkbox("Include Spike Noise", value=True)
+        seed = st.number_input("Random Seed", value=0, step=1, key="noise_seed")
         
         simulate_noise_btn = st.button("🎲 Simulate Noise", type="primary")
     
     with col2:
         if simulate_noise_btn:
             # Generate example spectrum
-            wavelength = np.linspace(wl_min, wl_max, 1000)
-            clean_spectrum = 0.1 * np.exp(-((wavelength - np.mean(wavelength))**2) / 20) + 0.02
+            wavelength, clean_spectrum = clean_gauss_spectrum(wl_min, wl_max)
             
             # Add noise
-            noisy_spectrum, noise_components = NoiseSimulator.simulate_realistic_noise(
-                clean_spectrum, wavelength, snr_db=snr_db,
-                include_shot=include_shot,
-                include_baseline=include_baseline,
-                include_spikes=include_spikes
-            )
-            
-            # Plot results
-            fig = make_subplots(
-                rows=2, cols=1,
-                subplot_titles=('Spectrum with Noise', 'Noise Components'),
-                vertical_spacing=0.15
-            )
-            
-            # Main spectrum
-            fig.add_trace(
-                go.Scatter(x=wavelength, y=clean_spectrum, mode='lines', 
-                          name='Clean Spectrum', line=dict(color='blue', width=2)),
-                row=1, col=1
-            )
-            fig.add_trace(
-                go.Scatter(x=wavelength, y=noisy_spectrum, mode='lines',
-                          name='Noisy Spectrum', line=dict(color='red', width=1)),
-                row=1, col=1
+            noisy_spectrum, noise_components = noise_realization(
+                wl_min, wl_max, snr_db, include_shot, include_baseline, include_spikes, int(seed)
             )
             
-            # Noise components
-            offset = 0
-            colors = ['cyan', 'orange', 'green', 'purple']
-            for i, (noise_type, noise_data) in enumerate(noise_components.items()):
-                fig.add_trace(
-                    go.Scatter(x=wavelength, y=noise_data + offset, mode='lines',
-                              name=f'{noise_type.title()} Noise', 
-                              line=dict(color=colors[i % len(colors)])),
-                    row=2, col=1
-                )
-                offset += np.max(np.abs(noise_data)) * 1.2
+            # Plot results: reuse the session's figure, replacing trace data only
+            if 'noise_fig' not in st.session_state:
+                st.session_state.noise_fig = build_noise_figure()
+            fig = st.session_state.noise_fig
             
-            fig.update_xaxes(title_text="Wavelength (nm)", row=2, col=1)
-            fig.update_yaxes(title_text="Absorption", row=1, col=1)
-            fig.update_yaxes(title_text="Noise Magnitude", row=2, col=1)
+            with fig.batch_update():
+                # Main spectrum
+                for trace, y in zip(fig.data[:2], (clean_spectrum, noisy_spectrum)):
+                    trace.x = wavelength
+                    trace.y = y
+                
+                # Noise components (unused component slots are hidden)
+                offset = 0
+                components = list(noise_components.items())
+                for i, trace in enumerate(fig.data[2:]):
+                    if i < len(components):
+                        noise_type, noise_data = components[i]
+                        trace.update(x=wavelength, y=noise_data + offset,
+                                     name=f'{noise_type.title()} Noise', visible=True)
+                        offset += np.max(np.abs(noise_data)) * 1.2
+                    else:
+                        trace.update(x=None, y=None, visible=False)
             
-            fig.update_layout(height=700)
             st.plotly_chart(fig, use_container_width=True)
             
             # Noise statistics
@@ -416,9 +569,22 @@ elif page == "📉 Uncertainty Analysis":
     
     with col2:
         if analyze_uncertainty_btn:
+            from advanced_analysis import UncertaintyAnalyzer
+            
             with st.spinner("Running Monte Carlo analysis..."):
-                # Define spectrum function
+                # Define spectrum function (broadcasts over all samples at once)
                 def spectrum_function(wl, amplitude, center, width, baseline):
+                    wl = np.asarray(wl, dtype=np.float64)
+                    params = (amplitude, center, width, baseline)
+                    shape = np.broadcast(wl, *params).shape
+                    # Compiled parallel loop only for one wavelength row against per-sample
+                    # parameters (constant along the wavelength axis); same output shape as NumPy
+                    if (_gauss_mc is not None and wl.ndim >= 1 and wl.size == shape[-1]
+                            and all(np.shape(p)[-1:] in ((), (1,)) for p in params)):
+                        rows = shape[:-1] + (1,)
+                        columns = [np.ravel(np.broadcast_to(np.asarray(p, dtype=np.float64), rows))
+                                   for p in params]
+                        return _gauss_mc(np.ravel(wl), *columns).reshape(shape)
                     return amplitude * np.exp(-((wl - center)**2) / width) + baseline
                 
                 # Parameters
@@ -442,93 +608,35 @@ elif page == "📉 Uncertainty Analysis":
                     base_params, uncertainties, num_samples
                 )
                 
-                wavelength = np.linspace(1500, 1520, 200)
-                uncertainty_results = analyzer.calculate_spectrum_uncertainty(
+                wavelength = wavelength_grid(1500.0, 1520.0, 200)
+                uncertainty_results = analyzer.calculate_spectrum_uncertainty_vectorized(
                     spectrum_function, wavelength, param_samples
                 )
                 
                 if uncertainty_results:
-                    # Plot uncertainty results
-                    fig = make_subplots(
-                        rows=3, cols=1,
-                        subplot_titles=('Spectrum with Confidence Interval', 
-                                      'Absolute Uncertainty', 'Relative Uncertainty (%)'),
-                        vertical_spacing=0.08
-                    )
-                    
-                    # Main spectrum with confidence interval
-                    fig.add_trace(
-                        go.Scatter(
-                            x=wavelength,
-                            y=uncertainty_results['confidence_upper'],
-                            mode='lines',
-                            line=dict(color='rgba(0,0,0,0)'),
-                            showlegend=False,
-                            hoverinfo='skip'
-                        ),
-                        row=1, col=1
-                    )
-                    
-                    fig.add_trace(
-                        go.Scatter(
-                            x=wavelength,
-                            y=uncertainty_results['confidence_lower'],
-                            mode='lines',
-                            line=dict(color='rgba(0,0,0,0)'),
-                            fill='tonexty',
-                            fillcolor='rgba(0,100,80,0.3)',
-                            name='95% Confidence Interval'
-                        ),
-                        row=1, col=1
-                    )
-                    
-                    fig.add_trace(
-                        go.Scatter(
-                            x=wavelength,
-                            y=uncertainty_results['mean_spectrum'],
-                            mode='lines',
-                            name='Mean Spectrum',
-                            line=dict(color='blue', width=2)
-                        ),
-                        row=1, col=1
-                    )
-                    
-                    # Standard deviation
-                    fig.add_trace(
-                        go.Scatter(
-                            x=wavelength,
-                            y=uncertainty_results['std_spectrum'],
-                            mode='lines',
-                            name='Standard Deviation',
-                            line=dict(color='red', width=2),
-                            showlegend=False
-                        ),
-                        row=2, col=1
-                    )
-                    
-                    # Relative uncertainty
-                    rel_uncertainty = (uncertainty_results['std_spectrum'] / 
-                                     np.abs(uncertainty_results['mean_spectrum'])) * 100
-                    rel_uncertainty = np.where(np.isfinite(rel_uncertainty), rel_uncertainty, np.nan)
-                    
-                    fig.add_trace(
-                        go.Scatter(
-                            x=wavelength,
-                            y=rel_uncertainty,
-                            mode='lines',
-                            name='Relative Uncertainty',
-                            line=dict(color='green', width=2),
-                            showlegend=False
-                        ),
-                        row=3, col=1
-                    )
+                    # Relative uncertainty (NaN where the mean is ~0, without divide warnings)
+                    denom = np.abs(uncertainty_results['mean_spectrum'])
+                    rel_uncertainty = np.full_like(denom, np.nan)
+                    np.divide(uncertainty_results['std_spectrum'], denom,
+                              out=rel_uncertainty, where=denom > 1e-12)
+                    rel_uncertainty *= 100
                     
-                    fig.update_xaxes(title_text="Wavelength (nm)", row=3, col=1)
-                    fig.update_yaxes(title_text="Absorption", row=1, col=1)
-                    fig.update_yaxes(title_text="Std Dev", row=2, col=1)
-                    fig.update_yaxes(title_text="Rel. Unc. (%)", row=3, col=1)
+                    # Plot uncertainty results: reuse the session's figure, replacing trace data only
+                    if 'unc_fig' not in st.session_state:
+                        st.session_state.unc_fig = build_uncertainty_figure()
+                    fig = st.session_state.unc_fig
+                    series = [
+                        uncertainty_results['confidence_upper'],
+                        uncertainty_results['confidence_lower'],
+                        uncertainty_results['mean_spectrum'],
+                        uncertainty_results['std_spectrum'],
+                        rel_uncertainty
+                    ]
+                    with fig.batch_update():
+                        for trace, y in zip(fig.data, series):
+                            trace.x = wavelength
+                            trace.y = y
                     
-                    fig.update_layout(height=800)
                     st.plotly_chart(fig, use_container_width=True)
                     
                     # Statistics
@@ -557,12 +665,19 @@ elif page == "⚙️ System Status":
             st.markdown("#### 💾 Cache Statistics")
             cache_stats = stats['cache']
             
-            st.metric("Cached Files", cache_stats['total_files'])
-            st.metric("Original Size", f"{cache_stats['total_size_mb']:.2f} MB")
-            st.metric("Compressed Size", f"{cache_stats['compressed_size_mb']:.2f} MB")
-            st.metric("Compression Ratio", f"{cache_stats['compression_ratio']*100:.1f}%")
-            st.metric("Space Saved", f"{cache_stats['space_saved_mb']:.2f} MB")
-            st.metric("Cache Hits", cache_stats['cache_hits'])
+            # One table instead of a metric element per value
+            st.dataframe(pd.DataFrame({
+                "Metric": ["Cached Files", "Original Size", "Compressed Size",
+                           "Compression Ratio", "Space Saved", "Cache Hits"],
+                "Value": [
+                    str(cache_stats['total_files']),
+                    f"{cache_stats['total_size_mb']:.2f} MB",
+                    f"{cache_stats['compressed_size_mb']:.2f} MB",
+                    f"{cache_stats['compression_ratio']*100:.1f}%",
+                    f"{cache_stats['space_saved_mb']:.2f} MB",
+                    str(cache_stats['cache_hits'])
+                ]
+            }), hide_index=True, use_container_width=True)
             
             if cache_stats['total_files'] > 0:
                 st.success("✅ Cache system operational")
@@ -574,10 +689,15 @@ elif page == "⚙️ System Status":
             memory_stats = stats['memory']
             system_stats = stats['system']
             
-            st.metric("Process Memory", f"{memory_stats['rss_mb']:.1f} MB")
-            st.metric("Memory Percentage", f"{memory_stats['percent']:.1f}%")
-            st.metric("System Memory", f"{system_stats['used_percent']:.1f}% used")
-            st.metric("Available Memory", f"{system_stats['available_gb']:.1f} GB")
+            st.dataframe(pd.DataFrame({
+                "Metric": ["Process Memory", "Memory Percentage", "System Memory", "Available Memory"],
+                "Value": [
+                    f"{memory_stats['rss_mb']:.1f} MB",
+                    f"{memory_stats['percent']:.1f}%",
+                    f"{system_stats['used_percent']:.1f}% used",
+                    f"{system_stats['available_gb']:.1f} GB"
+                ]
+            }), hide_index=True, use_container_width=True)
             
             if memory_stats['percent'] < 5:
                 st.success("✅ Memory usage optimal")
@@ -61,17 +61,16 @@ HITRAN_MOLECULES = {
 }
 
 # 분자 카테고리 정의
-MOLECULE_CATEGORIES = {
-    "주요 대기 성분": [mol for mol, info in HITRAN_MOLECULES.items() if info["category"] == "주요 대기 성분"],
-    "유기 화합물": [mol for mol, info in HITRAN_MOLECULES.items() if info["category"] == "유기 화합물"],
-    "할로겐 화합물": [mol for mol, info in HITRAN_MOLECULES.items() if info["category"] == "할로겐 화합물"],
-    "질소 화합물": [mol for mol, info in HITRAN_MOLECULES.items() if info["category"] == "질소 화합물"],
-    "황 화합물": [mol for mol, info in HITRAN_MOLECULES.items() if info["category"] == "황 화합물"],
-    "라디칼": [mol for mol, info in HITRAN_MOLECULES.items() if info["category"] == "라디칼"],
-    "인 화합물": [mol for mol, info in HITRAN_MOLECULES.items() if info["category"] == "인 화합물"],
-    "산소 화합물": [mol for mol, info in HITRAN_MOLECULES.items() if info["category"] == "산소 화합물"],
-    "이온": [mol for mol, info in HITRAN_MOLECULES.items() if info["category"] == "이온"],
-}
+# 카테고리 표시 순서는 고정하고, 분자 목록은 한 번의 순회로 채움
+MOLECULE_CATEGORIES = {category: [] for category in (
+    "주요 대기 성분", "유기 화합물", "할로겐 화합물", "질소 화합물", "황 화합물",
+    "라디칼", "인 화합물", "산소 화합물", "이온",
+)}
+for mol, info in HITRAN_MOLECULES.items():
+    MOLECULE_CATEGORIES.setdefault(info["category"], []).append(mol)
+
+# 분자 이름 -> HITRAN 분자 ID (API 모듈에서 공용으로 사용)
+MOLECULE_IDS = {mol: info["id"] for mol, info in HITRAN_MOLECULES.items()}
 
 # 파장 대역 바로가기 정보
 WAVELENGTH_SHORTCUTS = {
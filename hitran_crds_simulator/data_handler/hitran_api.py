@@ -7,6 +7,8 @@ import os
 import pandas as pd
 import astropy.units as u
 
+from constants import MOLECULE_IDS
+
 # 직접 설정
 HITRAN_CACHE_DIR = "cache/"
 HITRAN_DATA_DIR = "data/"
@@ -45,44 +47,12 @@ class HitranAPI:
             print(f"   파장 범위: {wavelength_min}-{wavelength_max} nm")
             print(f"   파수 범위: {wavenumber_min:.1f}-{wavenumber_max:.1f} cm^-1")
             
-            # HITRAN 분자 ID 매핑
-            molecule_ids = {
-                "H2O": 1,    # 물
-                "CO2": 2,    # 이산화탄소  
-                "O3": 3,     # 오존
-                "N2O": 4,    # 아산화질소
-                "CO": 5,     # 일산화탄소
-                "CH4": 6,    # 메탄
-                "O2": 7,     # 산소
-                "NO": 8,     # 일산화질소
-                "SO2": 9,    # 이산화황
-                "NO2": 10,   # 이산화질소
-                "NH3": 11,   # 암모니아
-                "HNO3": 12,  # 질산
-                "OH": 13,    # 하이드록실
-                "HF": 14,    # 플루오르화수소
-                "HCl": 15,   # 염화수소
-                "HBr": 16,   # 브롬화수소
-                "HI": 17,    # 요오드화수소
-                "ClO": 18,   # 염소산화물
-                "OCS": 19,   # 황화카르보닐
-                "H2CO": 20,  # 포름알데히드
-                "HOCl": 21,  # 차아염소산
-                "N2": 22,    # 질소
-                "HCN": 23,   # 시안화수소
-                "CH3Cl": 24, # 염화메틸
-                "H2O2": 25,  # 과산화수소
-                "C2H2": 26,  # 아세틸렌
-                "C2H6": 27,  # 에탄
-                "PH3": 28,   # 포스핀
-            }
-            
-            if molecule not in molecule_ids:
+            if molecule not in MOLECULE_IDS:
                 print(f"❌ 지원하지 않는 분자: {molecule}")
-                print(f"지원 분자: {list(molecule_ids.keys())}")
+                print(f"지원 분자: {list(MOLECULE_IDS.keys())}")
                 return None
             
-            molecule_id = molecule_ids[molecule]
+            molecule_id = MOLECULE_IDS[molecule]
             print(f"   분자 ID: {molecule_id}")
             
             # Hitran 클래스 사용
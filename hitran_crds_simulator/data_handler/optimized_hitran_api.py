@@ -4,42 +4,73 @@
 
 from astroquery import hitran
 import os
-import pandas as pd
+import io
+import json
+import atexit
+import threading
+from collections import OrderedDict
 import astropy.units as u
 import concurrent.futures
-import pickle
-import gzip
 import hashlib
-from datetime import datetime
 import time
 import gc
 import psutil
 import numpy as np
+from dataclasses import dataclass
+from functools import cached_property
 from typing import List, Dict, Any, Optional
 
+from constants import MOLECULE_IDS
+
+# 선택적 zstd 압축 코덱
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
 class MemoryMonitor:
-    """메모리 사용량 모니터링"""
+    """메모리 사용량 모니터링 (Process 객체 재사용, 측정값은 max_age초 동안 재사용)"""
     
-    @staticmethod
-    def get_memory_usage():
+    max_age = 0.1
+    _process = None
+    _usage = (0.0, None)
+    _system = (0.0, None)
+    
+    @classmethod
+    def get_memory_usage(cls):
         """현재 메모리 사용량 반환 (MB)"""
-        process = psutil.Process()
-        memory_info = process.memory_info()
-        return {
+        checked_at, usage = cls._usage
+        now = time.monotonic()
+        if usage is not None and now - checked_at < cls.max_age:
+            return usage
+        
+        if cls._process is None:
+            cls._process = psutil.Process()
+        memory_info = cls._process.memory_info()
+        usage = {
             'rss_mb': memory_info.rss / 1024 / 1024,  # 물리 메모리
             'vms_mb': memory_info.vms / 1024 / 1024,  # 가상 메모리
-            'percent': process.memory_percent()        # 시스템 메모리 대비 %
+            'percent': cls._process.memory_percent()   # 시스템 메모리 대비 %
         }
+        cls._usage = (now, usage)
+        return usage
     
-    @staticmethod
-    def get_system_memory():
+    @classmethod
+    def get_system_memory(cls):
         """시스템 전체 메모리 정보"""
+        checked_at, system = cls._system
+        now = time.monotonic()
+        if system is not None and now - checked_at < cls.max_age:
+            return system
+        
         memory = psutil.virtual_memory()
-        return {
+        system = {
             'total_gb': memory.total / 1024 / 1024 / 1024,
             'available_gb': memory.available / 1024 / 1024 / 1024,
             'used_percent': memory.percent
         }
+        cls._system = (now, system)
+        return system
     
     @staticmethod
     def print_memory_status(label=""):
@@ -51,49 +82,215 @@ class MemoryMonitor:
         print(f"   프로세스: {process_mem['rss_mb']:.1f}MB ({process_mem['percent']:.1f}%)")
         print(f"   시스템: {system_mem['used_percent']:.1f}% 사용중 ({system_mem['available_gb']:.1f}GB 사용가능)")
 
+@dataclass
+class LineSoA:
+    """HITRAN 라인 파라미터 (열 단위 배열 묶음, 파장 오름차순 정렬)
+    
+    nu는 선 위치 정밀도를 위해 float64, 나머지 파라미터는 float32로 저장
+    모든 열은 C-연속 배열 (캐시 로드 시 읽기 전용 메모리 맵) → _kernels의 numba 커널에 변환 없이 전달
+    """
+    nu: np.ndarray
+    sw: np.ndarray
+    gamma_air: Optional[np.ndarray] = None
+    n_air: Optional[np.ndarray] = None
+    elower: Optional[np.ndarray] = None
+    
+    FIELDS = ('nu', 'sw', 'gamma_air', 'n_air', 'elower')
+    
+    @classmethod
+    def from_table(cls, table):
+        """astropy Table (또는 DataFrame)에서 필요한 열만 추출 (nu는 float64, 나머지는 float32)"""
+        columns = {}
+        for name in cls.FIELDS:
+            dtype = np.float64 if name == 'nu' else np.float32
+            try:
+                columns[name] = np.asarray(table[name], dtype=dtype)
+            except KeyError:
+                columns[name] = None
+        
+        # 파장 오름차순 = 파수 내림차순으로 한 번만 정렬
+        order = np.argsort(columns['nu'], kind='stable')[::-1]
+        for name, values in columns.items():
+            if values is not None:
+                columns[name] = values[order]
+        return cls(**columns)
+    
+    @cached_property
+    def centers_nm(self):
+        """라인 중심 파장 (nm, 오름차순) - 역수 변환은 로드 시 한 번만 수행"""
+        return 1e7 * np.reciprocal(np.asarray(self.nu, dtype=np.float64))
+    
+    def to_arrays(self):
+        """존재하는 열 + 중심 파장을 {이름: 배열}로 반환 (npz 저장용)"""
+        arrays = {name: getattr(self, name) for name in self.FIELDS if getattr(self, name) is not None}
+        arrays['centers_nm'] = self.centers_nm
+        return arrays
+    
+    def select_wavelength(self, wavelength_min, wavelength_max):
+        """파장 범위 (nm) 안의 라인만 담은 새 LineSoA 반환"""
+        mask = (self.nu >= 1e7 / wavelength_max) & (self.nu <= 1e7 / wavelength_min)
+        subset = LineSoA(**{
+            name: getattr(self, name)[mask] if getattr(self, name) is not None else None
+            for name in self.FIELDS
+        })
+        if 'centers_nm' in self.__dict__:
+            subset.centers_nm = self.centers_nm[mask]
+        return subset
+    
+    def __len__(self):
+        return len(self.nu)
+    
+    def __getitem__(self, name):
+        """data['nu'] 형태의 기존 접근 방식 호환"""
+        value = getattr(self, name) if name in self.FIELDS else None
+        if value is None:
+            raise KeyError(name)
+        return value
+
 class OptimizedHitranCache:
     """메모리 최적화된 캐시 시스템"""
     
-    def __init__(self, cache_dir="cache/hitran_cache", compression_level=6):
+    def __init__(self, cache_dir="cache/hitran_cache", compression_level=3, flush_every=16, codec=None,
+                 memory_cache_mb=256, verbose=False):
+        """
+        Args:
+            codec: None = 비압축 .npy (메모리 맵 로드), 'zstd' = 열마다 zstd 압축 (.npy.zst)
+            compression_level: codec='zstd'일 때 압축 레벨
+            memory_cache_mb: 디스크 앞단 메모리 LRU 캐시 한도 (MB)
+            verbose: True면 저장/로드 전후 메모리 상태 출력 (psutil 조회 포함)
+        """
         self.cache_dir = cache_dir
         self.compression_level = compression_level
+        self.verbose = verbose
+        
+        if codec == 'zstd' and zstd is None:
+            print("⚠️ zstandard 미설치 - 비압축 .npy 캐시 사용")
+            codec = None
+        self.codec = codec
+        
+        # 메모리 LRU 캐시 (cache_key → LineSoA), 바이트 합이 한도를 넘으면 오래된 것부터 제거
+        self.memory_cache_bytes = int(memory_cache_mb * 1024 * 1024)
+        self._mem_cache: "OrderedDict[str, LineSoA]" = OrderedDict()
+        self._mem_sizes: Dict[str, int] = {}
+        self._mem_bytes = 0
         
         # 캐시 폴더 생성
         if not os.path.exists(cache_dir):
             os.makedirs(cache_dir)
         
-        # 메타데이터 파일
+        # 메타데이터 파일 (변경은 메모리에 모았다가 flush_every회마다 / 종료 시 저장)
         self.metadata_file = os.path.join(cache_dir, "cache_metadata.json")
+        self.flush_every = flush_every
+        self._pending_writes = 0
+        
+        # 메모리 LRU와 메타데이터 변경은 모두 이 잠금 안에서 (다운로드 워커 스레드가 동시에 접근)
+        self._lock = threading.Lock()
         self.load_metadata()
+        atexit.register(self.flush_metadata)
     
     def load_metadata(self):
-        """캐시 메타데이터 로드"""
+        """캐시 메타데이터 로드 (cache_key → 항목 dict)"""
+        self.metadata = {}
         if os.path.exists(self.metadata_file):
             try:
-                self.metadata = pd.read_json(self.metadata_file)
-            except:
-                self.metadata = pd.DataFrame(columns=['cache_key', 'file_path', 'created_time', 'access_count', 'file_size', 'compressed_size'])
-        else:
-            self.metadata = pd.DataFrame(columns=['cache_key', 'file_path', 'created_time', 'access_count', 'file_size', 'compressed_size'])
+                with open(self.metadata_file, 'r', encoding='utf-8') as f:
+                    records = json.load(f)
+                self.metadata = {record['cache_key']: record for record in records}
+            except (OSError, ValueError, KeyError, TypeError):
+                self.metadata = {}
     
     def save_metadata(self):
-        """메타데이터 저장"""
-        self.metadata.to_json(self.metadata_file, orient='records', date_format='iso')
+        """메타데이터 저장 (기존과 같은 레코드 배열 JSON)"""
+        with self._lock:
+            self._write_metadata()
+    
+    def flush_metadata(self):
+        """저장되지 않은 변경이 있으면 저장"""
+        with self._lock:
+            if self._pending_writes:
+                self._write_metadata()
+    
+    def _write_metadata(self):
+        """메타데이터 파일 쓰기 (self._lock을 잡은 상태에서 호출)"""
+        with open(self.metadata_file, 'w', encoding='utf-8') as f:
+            json.dump(list(self.metadata.values()), f)
+        self._pending_writes = 0
+    
+    def _metadata_changed(self):
+        """변경 횟수 누적, flush_every회마다 저장 (self._lock을 잡은 상태에서 호출)"""
+        self._pending_writes += 1
+        if self._pending_writes >= self.flush_every:
+            self._write_metadata()
+    
+    def _memory_status(self, label):
+        """verbose일 때만 메모리 상태 출력"""
+        if self.verbose:
+            MemoryMonitor.print_memory_status(label)
     
     def generate_cache_key(self, molecule, wavelength_min, wavelength_max):
-        """캐시 키 생성"""
-        key_string = f"{molecule}_{wavelength_min}_{wavelength_max}"
-        return hashlib.md5(key_string.encode()).hexdigest()
+        """캐시 키 생성 (파일명으로 안전한 경우 그대로, 아니면 blake2b 해시)"""
+        key_string = f"{molecule}_{float(wavelength_min):.4f}_{float(wavelength_max):.4f}"
+        if all(ch.isalnum() or ch in "._-+" for ch in key_string):
+            return key_string
+        return hashlib.blake2b(key_string.encode(), digest_size=16).hexdigest()
     
     def get_cache_path(self, cache_key):
-        """압축된 캐시 파일 경로"""
-        return os.path.join(self.cache_dir, f"{cache_key}.pkl.gz")
+        """캐시 디렉터리 경로 (열마다 .npy 파일 하나)"""
+        return os.path.join(self.cache_dir, cache_key)
     
     def is_cached(self, molecule, wavelength_min, wavelength_max):
         """캐시 존재 확인"""
         cache_key = self.generate_cache_key(molecule, wavelength_min, wavelength_max)
         cache_path = self.get_cache_path(cache_key)
-        return os.path.exists(cache_path)
+        return (os.path.exists(os.path.join(cache_path, "nu.npy"))
+                or os.path.exists(os.path.join(cache_path, "nu.npy.zst")))
+    
+    def _mem_put(self, cache_key, data, nbytes):
+        """메모리 캐시에 추가 후 한도 초과분을 LRU 순서로 제거 (self._lock을 잡은 상태에서 호출)"""
+        self._mem_drop(cache_key)
+        if nbytes > self.memory_cache_bytes:
+            return
+        self._mem_cache[cache_key] = data
+        self._mem_sizes[cache_key] = nbytes
+        self._mem_bytes += nbytes
+        while self._mem_bytes > self.memory_cache_bytes:
+            old_key, _ = self._mem_cache.popitem(last=False)
+            self._mem_bytes -= self._mem_sizes.pop(old_key)
+    
+    def _mem_drop(self, cache_key):
+        """메모리 캐시 항목 제거, 없으면 무시 (self._lock을 잡은 상태에서 호출)"""
+        if self._mem_cache.pop(cache_key, None) is not None:
+            self._mem_bytes -= self._mem_sizes.pop(cache_key)
+    
+    def _write_column(self, cache_path, name, array):
+        """열 하나 저장 (.npy 또는 .npy.zst), 파일 크기 반환"""
+        if self.codec == 'zstd':
+            buffer = io.BytesIO()
+            np.save(buffer, array)
+            file_path = os.path.join(cache_path, f"{name}.npy.zst")
+            with open(file_path, 'wb') as f:
+                f.write(zstd.ZstdCompressor(level=self.compression_level).compress(buffer.getbuffer()))
+        else:
+            file_path = os.path.join(cache_path, f"{name}.npy")
+            np.save(file_path, array)
+        return os.path.getsize(file_path)
+    
+    @staticmethod
+    def _read_column(file_path):
+        """열 하나 로드 - .npy는 메모리 맵, .npy.zst는 압축 해제"""
+        if file_path.endswith('.npy.zst'):
+            if zstd is None:
+                raise ImportError("zstandard가 필요합니다")
+            with open(file_path, 'rb') as f:
+                return np.load(io.BytesIO(zstd.ZstdDecompressor().decompress(f.read())))
+        return np.load(file_path, mmap_mode='r')
+    
+    def _count_access(self, cache_key):
+        """접근 횟수 증가 (self._lock을 잡은 상태에서 호출)"""
+        entry = self.metadata.get(cache_key)
+        if entry is not None:
+            entry['access_count'] += 1
+            self._metadata_changed()
     
     def save_to_cache(self, molecule, wavelength_min, wavelength_max, data):
         """압축하여 캐시에 저장"""
@@ -102,37 +299,38 @@ class OptimizedHitranCache:
         
         try:
             # 메모리 상태 확인
-            MemoryMonitor.print_memory_status("캐시 저장 전")
+            self._memory_status("캐시 저장 전")
             
-            # 데이터 압축 저장
-            with gzip.open(cache_path, 'wb', compresslevel=self.compression_level) as f:
-                pickle.dump(data, f)
+            # 열 배열 저장 (기본: 비압축 .npy로 로드 시 메모리 맵 가능)
+            arrays = data.to_arrays()
+            os.makedirs(cache_path, exist_ok=True)
+            with self._lock:
+                self._mem_drop(cache_key)
             
             # 파일 크기 정보
-            compressed_size = os.path.getsize(cache_path)
+            compressed_size = sum(
+                self._write_column(cache_path, name, array) for name, array in arrays.items()
+            )
             
-            # 원본 크기 추정 (압축 해제 없이)
-            original_size = len(pickle.dumps(data))
+            # 원본 크기 = 배열 바이트 합
+            original_size = sum(array.nbytes for array in arrays.values())
             compression_ratio = compressed_size / original_size if original_size > 0 else 0
             
-            # 메타데이터 업데이트
-            new_entry = pd.DataFrame({
-                'cache_key': [cache_key],
-                'file_path': [cache_path],
-                'created_time': [datetime.now().isoformat()],
-                'access_count': [1],
-                'file_size': [original_size],
-                'compressed_size': [compressed_size],
-                'molecule': [molecule],
-                'wavelength_min': [wavelength_min],
-                'wavelength_max': [wavelength_max],
-                'compression_ratio': [compression_ratio]
-            })
-            
-            # 기존 항목 제거 후 추가
-            self.metadata = self.metadata[self.metadata['cache_key'] != cache_key]
-            self.metadata = pd.concat([self.metadata, new_entry], ignore_index=True)
-            self.save_metadata()
+            # 메타데이터 업데이트 (같은 키는 덮어쓰기)
+            with self._lock:
+                self.metadata[cache_key] = {
+                    'cache_key': cache_key,
+                    'file_path': cache_path,
+                    'created_time': int(time.time()),  # epoch 초 (HitranCache와 같은 메타데이터 파일 공유)
+                    'access_count': 1,
+                    'file_size': int(original_size),
+                    'compressed_size': int(compressed_size),
+                    'molecule': molecule,
+                    'wavelength_min': float(wavelength_min),
+                    'wavelength_max': float(wavelength_max),
+                    'compression_ratio': float(compression_ratio)
+                }
+                self._metadata_changed()
             
             print(f"💾 압축 저장: {original_size/1024:.1f}KB → {compressed_size/1024:.1f}KB ({compression_ratio*100:.1f}%)")
             
@@ -140,7 +338,7 @@ class OptimizedHitranCache:
             del data
             gc.collect()
             
-            MemoryMonitor.print_memory_status("캐시 저장 후")
+            self._memory_status("캐시 저장 후")
             
             return True
             
@@ -153,20 +351,32 @@ class OptimizedHitranCache:
         cache_key = self.generate_cache_key(molecule, wavelength_min, wavelength_max)
         cache_path = self.get_cache_path(cache_key)
         
+        # 메모리 캐시 적중 시 디스크 접근 없이 반환
+        with self._lock:
+            data = self._mem_cache.get(cache_key)
+            if data is not None:
+                self._mem_cache.move_to_end(cache_key)
+                self._count_access(cache_key)
+        if data is not None:
+            return data
+        
         try:
-            MemoryMonitor.print_memory_status("캐시 로드 전")
-            
-            # 압축 해제하여 로드
-            with gzip.open(cache_path, 'rb') as f:
-                data = pickle.load(f)
+            self._memory_status("캐시 로드 전")
             
-            # 접근 횟수 증가
-            mask = self.metadata['cache_key'] == cache_key
-            if mask.any():
-                self.metadata.loc[mask, 'access_count'] += 1
-                self.save_metadata()
+            # .npy는 메모리 맵으로 로드 (실제로 접근하는 페이지만 읽힘)
+            arrays = {
+                file_name.split('.')[0]: self._read_column(os.path.join(cache_path, file_name))
+                for file_name in os.listdir(cache_path)
+                if file_name.endswith('.npy') or file_name.endswith('.npy.zst')
+            }
+            data = LineSoA(**{name: array for name, array in arrays.items() if name in LineSoA.FIELDS})
+            if 'centers_nm' in arrays:
+                data.centers_nm = arrays['centers_nm']
+            with self._lock:
+                self._mem_put(cache_key, data, sum(array.nbytes for array in arrays.values()))
+                self._count_access(cache_key)
             
-            MemoryMonitor.print_memory_status("캐시 로드 후")
+            self._memory_status("캐시 로드 후")
             
             return data
             
@@ -176,58 +386,66 @@ class OptimizedHitranCache:
     
     def get_cache_stats(self):
         """캐시 통계 (압축 정보 포함)"""
-        if len(self.metadata) == 0:
+        with self._lock:
+            entries = [dict(entry) for entry in self.metadata.values()]
+        
+        if len(entries) == 0:
             return {
                 'total_files': 0,
                 'total_size_mb': 0,
                 'compressed_size_mb': 0,
                 'compression_ratio': 0,
+                'space_saved_mb': 0,
                 'most_accessed': None,
                 'cache_hits': 0
             }
         
-        total_size = self.metadata['file_size'].sum() if 'file_size' in self.metadata.columns else 0
-        compressed_size = self.metadata['compressed_size'].sum() if 'compressed_size' in self.metadata.columns else 0
+        total_size = sum(entry.get('file_size', 0) for entry in entries)
+        compressed_size = sum(entry.get('compressed_size', 0) for entry in entries)
         
-        most_accessed = self.metadata.loc[self.metadata['access_count'].idxmax()]
+        most_accessed = max(entries, key=lambda entry: entry['access_count'])
         avg_compression = compressed_size / total_size if total_size > 0 else 0
         
         return {
-            'total_files': len(self.metadata),
+            'total_files': len(entries),
             'total_size_mb': total_size / (1024 * 1024),
             'compressed_size_mb': compressed_size / (1024 * 1024),
             'compression_ratio': avg_compression,
             'space_saved_mb': (total_size - compressed_size) / (1024 * 1024),
-            'most_accessed': f"{most_accessed['molecule']} ({most_accessed['access_count']}회)",
-            'cache_hits': self.metadata['access_count'].sum()
+            'most_accessed': f"{most_accessed.get('molecule')} ({most_accessed['access_count']}회)",
+            'cache_hits': sum(entry['access_count'] for entry in entries)
         }
     
     def cleanup_memory(self):
         """메모리 정리"""
         gc.collect()
-        MemoryMonitor.print_memory_status("메모리 정리 후")
+        self._memory_status("메모리 정리 후")
 
 class MemoryOptimizedHitranAPI:
     """메모리 최적화된 HITRAN API"""
     
-    def __init__(self, max_memory_mb=1000):
-        """초기화"""
+    def __init__(self, max_memory_mb=1000, verbose=False):
+        """초기화 (verbose=True면 단계별 메모리 상태 출력)"""
         self.max_memory_mb = max_memory_mb
+        self.verbose = verbose
         
         # 폴더 생성
         os.makedirs("cache/", exist_ok=True)
         os.makedirs("data/", exist_ok=True)
         
         # 최적화된 캐시 시스템
-        self.cache = OptimizedHitranCache()
+        # 메모리 캐시는 전체 메모리 한도의 1/4까지 사용
+        self.cache = OptimizedHitranCache(memory_cache_mb=max_memory_mb / 4, verbose=verbose)
         
-        # 분자 ID 매핑
-        self.molecule_ids = {
-            "H2O": 1, "CO2": 2, "O3": 3, "N2O": 4, "CO": 5, "CH4": 6,
-            "O2": 7, "NO": 8, "SO2": 9, "NO2": 10, "NH3": 11, "HNO3": 12
-        }
+        # HITRAN 클라이언트는 하나만 만들어 재사용 (내부 HTTP 세션의 keep-alive 연결 공유)
+        self.hitran_query = hitran.Hitran()
         
-        MemoryMonitor.print_memory_status("API 초기화")
+        self._memory_status("API 초기화")
+    
+    def _memory_status(self, label):
+        """verbose일 때만 메모리 상태 출력"""
+        if self.verbose:
+            MemoryMonitor.print_memory_status(label)
     
     def check_memory_limit(self):
         """메모리 한계 확인"""
@@ -260,25 +478,27 @@ class MemoryOptimizedHitranAPI:
             wavenumber_max = 1e7 / wavelength_min
             
             print(f"📥 {molecule} 데이터 다운로드 중 (청크 크기: {chunk_size})")
-            MemoryMonitor.print_memory_status("다운로드 시작")
+            self._memory_status("다운로드 시작")
             
-            if molecule not in self.molecule_ids:
+            if molecule not in MOLECULE_IDS:
                 print(f"❌ 지원하지 않는 분자: {molecule}")
                 return None
             
-            molecule_id = self.molecule_ids[molecule]
-            hitran_query = hitran.Hitran()
-            
+            molecule_id = MOLECULE_IDS[molecule]
             # 데이터 다운로드
-            data = hitran_query.query_lines(
+            table = self.hitran_query.query_lines(
                 molecule_number=molecule_id, 
                 isotopologue_number=1,
                 min_frequency=wavenumber_min * u.cm**-1,
                 max_frequency=wavenumber_max * u.cm**-1
             )
             
+            # 계산에 필요한 열만 SoA로 변환 (nu float64, 나머지 float32)
+            data = LineSoA.from_table(table)
+            del table
+            
             print(f"✅ {molecule} 데이터 다운로드 완료! (라인 수: {len(data)})")
-            MemoryMonitor.print_memory_status("다운로드 완료")
+            self._memory_status("다운로드 완료")
             
             # 캐시에 저장
             if use_cache:
@@ -293,12 +513,43 @@ class MemoryOptimizedHitranAPI:
             # 메모리 정리
             gc.collect()
     
+    @staticmethod
+    def _merge_ranges(ranges):
+        """겹치거나 맞닿은 파장 범위를 합침 (정렬 후 한 번 순회)"""
+        merged = []
+        for wl_min, wl_max in sorted(ranges):
+            if merged and wl_min <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], wl_max)
+                merged[-1][2].append((wl_min, wl_max))
+            else:
+                merged.append([wl_min, wl_max, [(wl_min, wl_max)]])
+        return merged
+    
+    def _download_merged(self, molecule, wavelength_min, wavelength_max, ranges):
+        """
+        합친 범위를 한 번에 다운로드한 뒤 요청된 범위별로 잘라 캐시에 저장
+        
+        Returns:
+            합친 범위 전체 데이터 (요청된 모든 범위를 포함)
+        """
+        if len(ranges) == 1:
+            return self.download_molecule_data_chunked(molecule, *ranges[0])
+        
+        print(f"🔗 {molecule} 범위 {len(ranges)}개를 {wavelength_min}-{wavelength_max} nm 한 번의 쿼리로 병합")
+        data = self.download_molecule_data_chunked(molecule, wavelength_min, wavelength_max, use_cache=False)
+        if data is None:
+            return None
+        
+        for wl_min, wl_max in ranges:
+            self.cache.save_to_cache(molecule, wl_min, wl_max, data.select_wavelength(wl_min, wl_max))
+        return data
+    
     def download_multiple_molecules_optimized(self, molecules_params, max_workers=3):
         """메모리 최적화된 병렬 다운로드"""
         results = {}
         
         print(f"🔄 {len(molecules_params)}개 분자 메모리 최적화 병렬 다운로드")
-        MemoryMonitor.print_memory_status("병렬 다운로드 시작")
+        self._memory_status("병렬 다운로드 시작")
         
         # 메모리 사용량을 고려하여 worker 수 조정
         memory_info = MemoryMonitor.get_system_memory()
@@ -306,10 +557,21 @@ class MemoryOptimizedHitranAPI:
             max_workers = min(max_workers, 2)
             print(f"⚠️ 메모리 부족으로 worker 수 조정: {max_workers}")
         
+        # 캐시에 없는 범위는 분자별로 겹치는 구간을 합쳐 쿼리 수를 줄임
+        jobs = []
+        uncached = {}
+        for mol, wl_min, wl_max in molecules_params:
+            if self.cache.is_cached(mol, wl_min, wl_max):
+                jobs.append((mol, wl_min, wl_max, [(wl_min, wl_max)]))
+            else:
+                uncached.setdefault(mol, []).append((wl_min, wl_max))
+        for mol, ranges in uncached.items():
+            jobs.extend((mol, lo, hi, parts) for lo, hi, parts in self._merge_ranges(ranges))
+        
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
             future_to_molecule = {
-                executor.submit(self.download_molecule_data_chunked, mol, wl_min, wl_max): mol
-                for mol, wl_min, wl_max in molecules_params
+                executor.submit(self._download_merged, mol, wl_min, wl_max, ranges): mol
+                for mol, wl_min, wl_max, ranges in jobs
             }
             
             for future in concurrent.futures.as_completed(future_to_molecule):
@@ -330,7 +592,7 @@ class MemoryOptimizedHitranAPI:
         self.cache.cleanup_memory()
         
         print(f"✅ 메모리 최적화 병렬 다운로드 완료! 성공: {sum(1 for v in results.values() if v is not None)}/{len(molecules_params)}")
-        MemoryMonitor.print_memory_status("병렬 다운로드 완료")
+        self._memory_status("병렬 다운로드 완료")
         
         return results
     
@@ -354,7 +616,7 @@ if __name__ == "__main__":
     system_info = MemoryMonitor.get_system_memory()
     print(f"💻 시스템 메모리: {system_info['total_gb']:.1f}GB (사용가능: {system_info['available_gb']:.1f}GB)")
     
-    api = MemoryOptimizedHitranAPI(max_memory_mb=500)  # 500MB 제한
+    api = MemoryOptimizedHitranAPI(max_memory_mb=500, verbose=True)  # 500MB 제한
     
     # === 메모리 최적화 테스트 ===
     print("\n1️⃣ 단일 분자 테스트 (메모리 최적화)")
@@ -6,7 +6,8 @@ import numpy as np
 from data_handler.hitran_api import HitranAPI
 from spectrum_calc.absorption import SpectrumCalculator
 
-def debug_calculation():
+def debug_calculation(save_plot=False):
+    """save_plot=True일 때만 matplotlib를 불러와 그래프 저장/표시"""
     print("=== 스펙트럼 계산 과정 디버깅 ===")
     
     # HITRAN 데이터 다운로드
@@ -24,22 +25,22 @@ def debug_calculation():
     # 계산기 초기화
     calc = SpectrumCalculator()
     
-    # 가장 강한 라인만 가지고 테스트
-    strongest_line = None
-    max_intensity = 0
+    # astropy Column 대신 NumPy 열로 한 번만 변환
+    nu = np.asarray(hitran_data['nu'], dtype=np.float64)
+    sw = np.asarray(hitran_data['sw'], dtype=np.float64)
+    gamma_air = np.asarray(hitran_data['gamma_air'], dtype=np.float64)
     
-    for line in hitran_data:
-        if line['sw'] > max_intensity:
-            max_intensity = line['sw']
-            strongest_line = line
+    # 가장 강한 라인 정보
+    max_idx = int(np.argmax(sw))
+    strongest_line = {'nu': nu[max_idx], 'sw': sw[max_idx], 'gamma_air': gamma_air[max_idx]}
     
     print(f"\n=== 가장 강한 라인 정보 ===")
     print(f"중심 주파수: {strongest_line['nu']:.4f} cm^-1")
     print(f"선 강도: {strongest_line['sw']:.4e}")
     print(f"공기 확장: {strongest_line['gamma_air']:.4e}")
     
-    # 한 라인만으로 계산 테스트
-    print(f"\n=== 단일 라인 계산 테스트 ===")
+    # 전체 라인을 한 번에 계산 (라인 × 주파수 행렬)
+    print(f"\n=== 전체 라인 배치 계산 테스트 ({len(nu)} 라인) ===")
     
     # 파라미터들
     temperature = 296.15
@@ -47,21 +48,26 @@ def debug_calculation():
     concentration = 0.001
     path_length = 30000.0
     molecular_mass = 18.015
+    broadening_max_width = 10.0  # cm^-1, 이보다 먼 라인의 꼬리는 무시
     
-    # 도플러 폭 계산
-    gamma_d = calc.calculate_doppler_width(strongest_line['nu'], temperature, molecular_mass)
-    print(f"도플러 폭: {gamma_d:.6e} cm^-1")
+    # 주파수 격자 ± broadening_max_width 안에 중심이 있는 라인만 계산
+    in_window = (nu >= freq_min - broadening_max_width) & (nu <= freq_max + broadening_max_width)
+    print(f"계산 대상 라인: {np.count_nonzero(in_window)}/{len(nu)}")
     
-    # 로렌츠 폭 계산
-    gamma_l = calc.calculate_lorentz_width(strongest_line['gamma_air'], pressure, temperature)
-    print(f"로렌츠 폭: {gamma_l:.6e} cm^-1")
+    # 도플러 폭 계산 (라인별 배열)
+    gamma_d = calc.calculate_doppler_width(nu[in_window], temperature, molecular_mass)
+    print(f"도플러 폭 (가장 강한 라인): {calc.calculate_doppler_width(strongest_line['nu'], temperature, molecular_mass):.6e} cm^-1")
     
-    # Voigt 프로파일 계산
-    line_shape = calc.voigt_profile(frequency_grid, strongest_line['nu'], gamma_l, gamma_d)
+    # 로렌츠 폭 계산 (라인별 배열)
+    gamma_l = calc.calculate_lorentz_width(gamma_air[in_window], pressure, temperature)
+    print(f"로렌츠 폭 (가장 강한 라인): {calc.calculate_lorentz_width(strongest_line['gamma_air'], pressure, temperature):.6e} cm^-1")
+    
+    # Voigt 프로파일 계산 (N_lines × N_freq)
+    line_shape = calc.voigt_profile_batch(frequency_grid, nu[in_window], gamma_l, gamma_d)
     print(f"Voigt 프로파일 최대값: {np.max(line_shape):.6e}")
     
-    # 흡수 계수 계산
-    absorption_coeff = strongest_line['sw'] * concentration * line_shape
+    # 흡수 계수 계산 (선 강도 가중합)
+    absorption_coeff = (sw[in_window] @ line_shape) * concentration
     print(f"흡수 계수 최대값: {np.max(absorption_coeff):.6e}")
     
     # 투과율 계산
@@ -73,6 +79,9 @@ def debug_calculation():
     absorbance = -np.log10(transmittance)
     print(f"흡광도 최대값: {np.max(absorbance):.6f}")
     
+    if not save_plot:
+        return
+    
     # 간단한 그래프
     import matplotlib.pyplot as plt
     
@@ -83,14 +92,14 @@ def debug_calculation():
     plt.plot(wavelength_nm, transmittance)
     plt.xlabel('Wavelength (nm)')
     plt.ylabel('Transmittance')
-    plt.title('Single Line Test - Transmittance')
+    plt.title('All Lines Test - Transmittance')
     plt.grid(True)
     
     plt.subplot(2, 1, 2)
     plt.plot(wavelength_nm, absorbance)
     plt.xlabel('Wavelength (nm)')
     plt.ylabel('Absorbance')
-    plt.title('Single Line Test - Absorbance')
+    plt.title('All Lines Test - Absorbance')
     plt.grid(True)
     
     plt.tight_layout()
@@ -98,4 +107,4 @@ def debug_calculation():
     plt.show()
 
 if __name__ == "__main__":
-    debug_calculation()
\ No newline at end of file
+    debug_calculation(save_plot=True)
\ No newline at end of file
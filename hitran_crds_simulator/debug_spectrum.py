@@ -31,17 +31,18 @@ def debug_hitran_data():
         print()
     
     # 주파수 범위 확인
-    frequencies = [line['nu'] for line in hitran_data]
-    print(f"✅ 주파수 범위: {min(frequencies):.1f} - {max(frequencies):.1f} cm^-1")
-    print(f"✅ 파장 범위: {1e7/max(frequencies):.1f} - {1e7/min(frequencies):.1f} nm")
+    frequencies = np.asarray(hitran_data['nu'])
+    nu_min, nu_max = frequencies.min(), frequencies.max()
+    print(f"✅ 주파수 범위: {nu_min:.1f} - {nu_max:.1f} cm^-1")
+    print(f"✅ 파장 범위: {1e7/nu_max:.1f} - {1e7/nu_min:.1f} nm")
     
     # 강한 흡수선 찾기
-    intensities = [line['sw'] for line in hitran_data]
-    max_intensity = max(intensities)
+    intensities = np.asarray(hitran_data['sw'])
+    max_idx = int(np.argmax(intensities))
+    max_intensity = intensities[max_idx]
     print(f"✅ 최대 선 강도: {max_intensity:.4e}")
     
     # 가장 강한 라인 찾기
-    max_idx = intensities.index(max_intensity)
     strongest_line = hitran_data[max_idx]
     print(f"✅ 가장 강한 라인:")
     print(f"   주파수: {strongest_line['nu']:.4f} cm^-1")
@@ -4,132 +4,17 @@
 
 from astroquery import hitran
 import os
-import pandas as pd
+import threading
+from collections import OrderedDict
 import astropy.units as u
 import concurrent.futures
-import pickle
-import hashlib
-from datetime import datetime
 import time
 
-class HitranCache:
-    def __init__(self, cache_dir="cache/hitran_cache"):
-        self.cache_dir = cache_dir
-        
-        # 캐시 폴더 생성
-        if not os.path.exists(cache_dir):
-            os.makedirs(cache_dir)
-        
-        # 캐시 메타데이터 파일
-        self.metadata_file = os.path.join(cache_dir, "cache_metadata.json")
-        self.load_metadata()
-    
-    def load_metadata(self):
-        """캐시 메타데이터 로드"""
-        if os.path.exists(self.metadata_file):
-            try:
-                self.metadata = pd.read_json(self.metadata_file)
-            except:
-                self.metadata = pd.DataFrame(columns=['cache_key', 'file_path', 'created_time', 'access_count', 'file_size'])
-        else:
-            self.metadata = pd.DataFrame(columns=['cache_key', 'file_path', 'created_time', 'access_count', 'file_size'])
-    
-    def save_metadata(self):
-        """캐시 메타데이터 저장"""
-        self.metadata.to_json(self.metadata_file, orient='records', date_format='iso')
-    
-    def generate_cache_key(self, molecule, wavelength_min, wavelength_max):
-        """캐시 키 생성"""
-        key_string = f"{molecule}_{wavelength_min}_{wavelength_max}"
-        return hashlib.md5(key_string.encode()).hexdigest()
-    
-    def get_cache_path(self, cache_key):
-        """캐시 파일 경로 생성"""
-        return os.path.join(self.cache_dir, f"{cache_key}.pkl")
-    
-    def is_cached(self, molecule, wavelength_min, wavelength_max):
-        """캐시 존재 여부 확인"""
-        cache_key = self.generate_cache_key(molecule, wavelength_min, wavelength_max)
-        cache_path = self.get_cache_path(cache_key)
-        return os.path.exists(cache_path)
-    
-    def save_to_cache(self, molecule, wavelength_min, wavelength_max, data):
-        """데이터를 캐시에 저장"""
-        cache_key = self.generate_cache_key(molecule, wavelength_min, wavelength_max)
-        cache_path = self.get_cache_path(cache_key)
-        
-        try:
-            # 데이터 저장
-            with open(cache_path, 'wb') as f:
-                pickle.dump(data, f)
-            
-            # 메타데이터 업데이트
-            file_size = os.path.getsize(cache_path)
-            new_entry = pd.DataFrame({
-                'cache_key': [cache_key],
-                'file_path': [cache_path],
-                'created_time': [datetime.now().isoformat()],
-                'access_count': [1],
-                'file_size': [file_size],
-                'molecule': [molecule],
-                'wavelength_min': [wavelength_min],
-                'wavelength_max': [wavelength_max]
-            })
-            
-            # 기존 항목 제거 후 추가
-            self.metadata = self.metadata[self.metadata['cache_key'] != cache_key]
-            self.metadata = pd.concat([self.metadata, new_entry], ignore_index=True)
-            self.save_metadata()
-            
-            return True
-        except Exception as e:
-            print(f"캐시 저장 실패: {e}")
-            return False
-    
-    def load_from_cache(self, molecule, wavelength_min, wavelength_max):
-        """캐시에서 데이터 로드"""
-        cache_key = self.generate_cache_key(molecule, wavelength_min, wavelength_max)
-        cache_path = self.get_cache_path(cache_key)
-        
-        try:
-            with open(cache_path, 'rb') as f:
-                data = pickle.load(f)
-            
-            # 접근 횟수 증가
-            mask = self.metadata['cache_key'] == cache_key
-            if mask.any():
-                self.metadata.loc[mask, 'access_count'] += 1
-                self.save_metadata()
-            
-            return data
-        except Exception as e:
-            print(f"캐시 로드 실패: {e}")
-            return None
-    
-    def get_cache_stats(self):
-        """캐시 통계 정보"""
-        if len(self.metadata) == 0:
-            return {
-                'total_files': 0,
-                'total_size_mb': 0,
-                'most_accessed': None,
-                'oldest_file': None,
-                'cache_hits': 0
-            }
-        
-        total_size = self.metadata['file_size'].sum()
-        most_accessed = self.metadata.loc[self.metadata['access_count'].idxmax()]
-        
-        return {
-            'total_files': len(self.metadata),
-            'total_size_mb': total_size / (1024 * 1024),
-            'most_accessed': f"{most_accessed['molecule']} ({most_accessed['access_count']}회)",
-            'cache_hits': self.metadata['access_count'].sum()
-        }
+from spectrum_calc.cache_manager import HitranCache
 
 class OptimizedHitranAPI:
-    def __init__(self):
-        """최적화된 HITRAN API 초기화"""
+    def __init__(self, memory_cache_size=32):
+        """최적화된 HITRAN API 초기화 (memory_cache_size: 메모리에 둘 최근 결과 수)"""
         # 데이터 폴더 생성
         os.makedirs("cache/", exist_ok=True)
         os.makedirs("data/", exist_ok=True)
@@ -137,20 +22,48 @@ class OptimizedHitranAPI:
         # 캐시 관리자 초기화
         self.cache = HitranCache()
         
+        # 프로세스 내 LRU: (분자, 최소 파장, 최대 파장) → 데이터, 반복 호출은 디스크 접근 없이 반환
+        self.memory_cache_size = memory_cache_size
+        self._mem_cache = OrderedDict()
+        self._mem_lock = threading.Lock()
+        
+        # HITRAN 클라이언트는 하나만 만들어 재사용 (내부 HTTP 세션의 keep-alive 연결 공유)
+        self.hitran_query = hitran.Hitran()
+        
         # HITRAN 분자 ID 매핑
         self.molecule_ids = {
             "H2O": 1, "CO2": 2, "O3": 3, "N2O": 4, "CO": 5, "CH4": 6,
             "O2": 7, "NO": 8, "SO2": 9, "NO2": 10, "NH3": 11, "HNO3": 12
         }
     
+    def _remember(self, key, data):
+        """메모리 LRU에 추가, 크기 초과 시 가장 오래된 항목 제거"""
+        with self._mem_lock:
+            self._mem_cache[key] = data
+            self._mem_cache.move_to_end(key)
+            while len(self._mem_cache) > self.memory_cache_size:
+                self._mem_cache.popitem(last=False)
+    
     def download_molecule_data(self, molecule, wavelength_min, wavelength_max, use_cache=True):
         """분자 데이터 다운로드 (캐싱 지원)"""
-        # 캐시 확인
+        key = (molecule, float(wavelength_min), float(wavelength_max))
+        
+        # 메모리 캐시 확인
+        if use_cache:
+            with self._mem_lock:
+                data = self._mem_cache.get(key)
+                if data is not None:
+                    self._mem_cache.move_to_end(key)
+            if data is not None:
+                return data
+        
+        # 디스크 캐시 확인
         if use_cache and self.cache.is_cached(molecule, wavelength_min, wavelength_max):
             print(f"🚀 {molecule} 캐시에서 로드 중...")
             data = self.cache.load_from_cache(molecule, wavelength_min, wavelength_max)
             if data is not None:
                 print(f"✅ {molecule} 캐시 로드 완료! (라인 수: {len(data)})")
+                self._remember(key, data)
                 return data
         
         # 캐시에 없으면 다운로드
@@ -165,9 +78,7 @@ class OptimizedHitranAPI:
                 return None
             
             molecule_id = self.molecule_ids[molecule]
-            hitran_query = hitran.Hitran()
-            
-            data = hitran_query.query_lines(
+            data = self.hitran_query.query_lines(
                 molecule_number=molecule_id, 
                 isotopologue_number=1,
                 min_frequency=wavenumber_min * u.cm**-1,
@@ -180,6 +91,7 @@ class OptimizedHitranAPI:
             if use_cache:
                 if self.cache.save_to_cache(molecule, wavelength_min, wavelength_max, data):
                     print(f"💾 {molecule} 데이터 캐시에 저장됨")
+                self._remember(key, data)
             
             return data
             
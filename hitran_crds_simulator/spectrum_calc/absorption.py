@@ -2,11 +2,48 @@
 스펙트럼 흡수 계산 모듈
 """
 
+import os
+import concurrent.futures
 import numpy as np
 import pandas as pd
+from collections import OrderedDict
 from scipy.special import wofz
 import matplotlib.pyplot as plt
 
+from _kernels import _voigt_sum, get_voigt_sum_gpu
+
+# 분자별 분자량 (g/mol)
+MOLECULAR_MASSES = {
+    "H2O": 18.015,
+    "CO2": 44.01,
+    "CH4": 16.04,
+    "NH3": 17.03,
+    "N2O": 44.01,
+    "CO": 28.01,
+    "O3": 47.998,
+    "SO2": 64.066,
+    "NO2": 46.006,
+    "HNO3": 63.01,
+    "O2": 31.998,
+    "NO": 30.006,
+    "OH": 17.007,
+    "HF": 20.006,
+    "HCl": 36.458,
+    "HBr": 80.912,
+    "HI": 127.912,
+    "ClO": 51.452,
+    "OCS": 60.076,
+    "H2CO": 30.026,
+    "HOCl": 52.460,
+    "N2": 28.014,
+    "HCN": 27.026,
+    "CH3Cl": 50.487,
+    "H2O2": 34.015,
+    "C2H2": 26.037,
+    "C2H6": 30.069,
+    "PH3": 33.998
+}
+
 class SpectrumCalculator:
     def __init__(self):
         """스펙트럼 계산기 초기화"""
@@ -14,6 +51,23 @@ class SpectrumCalculator:
         self.c = 2.99792458e8  # 빛의 속도 m/s
         self.k_B = 1.380649e-23  # 볼츠만 상수 J/K
         self.N_A = 6.02214076e23  # 아보가드로 수
+        self.inv_sqrt_pi = 1.0 / np.sqrt(np.pi)  # Voigt 정규화 상수
+        
+        # Voigt 합을 나눠 계산할 라인 블록 크기 (블록 × 주파수 행렬이 캐시에 머물도록)
+        self.line_block_size = 256
+        
+        # 라인별 계산 구간: 중심 ± line_cutoff_widths × max(γ_L, γ_D)
+        self.line_cutoff_widths = 50
+        
+        # 가장 강한 라인 대비 이 비율보다 약한 라인은 계산에서 제외
+        self.intensity_cutoff = 1e-10
+        
+        # 최근 라인 합 (단위 농도) 캐시 - 농도/경로 길이 스윕 시 Voigt 재계산 생략
+        self.line_sum_cache_size = 8
+        
+        # 라인 수 × 격자 점 수가 이 값 이상이면 (GPU가 있을 때) CUDA 커널 사용
+        self.gpu_min_work = 10_000_000
+        self._line_sum_cache = OrderedDict()
         
     def voigt_profile(self, frequency, center_freq, gamma_lorentz, gamma_doppler):
         """
@@ -34,9 +88,39 @@ class SpectrumCalculator:
         w = wofz(z)
         
         # 정규화
-        profile = w.real / (gamma_doppler * np.sqrt(np.pi))
+        profile = w.real * (self.inv_sqrt_pi / gamma_doppler)
         return profile
     
+    def voigt_profile_batch(self, frequency, center_freqs, gamma_lorentz, gamma_doppler, single_precision=False):
+        """
+        여러 라인의 Voigt 프로파일을 한 번에 계산
+        
+        Args:
+            frequency: 주파수 배열 (cm^-1), 길이 N_freq 또는 라인별 구간 (N_lines, W)
+            center_freqs: 라인 중심 주파수 배열 (cm^-1), 길이 N_lines
+            gamma_lorentz: 라인별 Lorentz 반폭 (cm^-1)
+            gamma_doppler: 라인별 Doppler 반폭 (cm^-1)
+            single_precision: True면 정규화된 z를 complex64로 내려 wofz를 단정밀도로 계산
+        
+        Returns:
+            (N_lines, N_freq) 또는 (N_lines, W) 프로파일 행렬 (single_precision이면 float32)
+        """
+        frequency = np.asarray(frequency, dtype=np.float64)
+        if frequency.ndim == 1:
+            frequency = frequency[None, :]
+        center_freqs = np.asarray(center_freqs, dtype=np.float64)[:, None]
+        gamma_lorentz = np.asarray(gamma_lorentz, dtype=np.float64)[:, None]
+        gamma_doppler = np.asarray(gamma_doppler, dtype=np.float64)[:, None]
+        
+        # voigt_profile과 같은 식을 라인 축으로 브로드캐스트
+        # 중심과의 차이는 float64로 구한 뒤 (정규화된 z는 O(1) 크기라 단정밀도로 충분)
+        z = (frequency - center_freqs + 1j * gamma_lorentz) / gamma_doppler
+        scale = self.inv_sqrt_pi / gamma_doppler
+        if single_precision:
+            z = z.astype(np.complex64)
+            scale = scale.astype(np.float32)
+        return wofz(z).real * scale
+    
     def calculate_doppler_width(self, center_freq, temperature, molecular_mass):
         """
         도플러 폭 계산
@@ -46,10 +130,11 @@ class SpectrumCalculator:
             temperature: 온도 (K)
             molecular_mass: 분자량 (g/mol)
         """
-        # 도플러 폭 공식
-        gamma_doppler = (center_freq / self.c) * np.sqrt(
+        # 도플러 폭 공식 (라인과 무관한 계수는 스칼라로 한 번만 계산)
+        doppler_prefactor = np.sqrt(
             2 * self.k_B * temperature * self.N_A / (molecular_mass * 1e-3)
-        )
+        ) / self.c
+        gamma_doppler = center_freq * doppler_prefactor
         return gamma_doppler
     
     def calculate_lorentz_width(self, pressure_broadening, pressure, temperature, ref_temp=296.0):
@@ -62,10 +147,87 @@ class SpectrumCalculator:
             temperature: 온도 (K)
             ref_temp: 참조 온도 (K)
         """
-        # 온도 의존성을 고려한 로렌츠 폭
-        gamma_lorentz = pressure_broadening * pressure * (ref_temp / temperature)**0.5
+        # 온도 의존성을 고려한 로렌츠 폭 (스칼라 계수를 먼저 묶어 배열 연산 1회)
+        gamma_lorentz = pressure_broadening * (pressure * (ref_temp / temperature)**0.5)
         return gamma_lorentz
     
+    def _windowed_voigt_sum(self, frequency_grid, center_freq, weights, gamma_l, gamma_d, cutoff):
+        """
+        구간 제한 Voigt 가중합 (NumPy 경로, numba가 없을 때 사용)
+        
+        라인 블록마다 구간을 블록 내 최대 폭으로 맞춰 한 번에 계산한 뒤 격자에 누적
+        """
+        n_freq = len(frequency_grid)
+        lo = np.searchsorted(frequency_grid, center_freq - cutoff)
+        hi = np.searchsorted(frequency_grid, center_freq + cutoff, side='right')
+        
+        # 누적 배열은 float32 (플롯/분석에 충분한 정밀도, 대역폭 절반)
+        weights = weights.astype(np.float32)
+        absorption_coeff = np.zeros(n_freq, dtype=np.float32)
+        for start in range(0, len(center_freq), self.line_block_size):
+            block = slice(start, start + self.line_block_size)
+            width = int((hi[block] - lo[block]).max(initial=0))
+            if width == 0:
+                continue
+            
+            index = lo[block, None] + np.arange(width)
+            in_window = index < hi[block, None]
+            index = np.minimum(index, n_freq - 1)
+            
+            line_shapes = self.voigt_profile_batch(
+                frequency_grid[index], center_freq[block], gamma_l[block], gamma_d[block], single_precision=True
+            )
+            contribution = weights[block, None] * line_shapes
+            absorption_coeff += np.bincount(
+                index[in_window], weights=contribution[in_window], minlength=n_freq
+            ).astype(np.float32)
+        
+        return absorption_coeff
+    
+    def _strong_lines(self, hitran_data):
+        """라인 파라미터를 열 단위 NumPy 배열로 변환하고 너무 약한 라인 제외"""
+        center_freq = np.asarray(hitran_data['nu'], dtype=np.float64)  # 중심 주파수 (cm^-1)
+        intensity = np.asarray(hitran_data['sw'], dtype=np.float64)    # 선 강도
+        gamma_air = np.asarray(hitran_data['gamma_air'], dtype=np.float64)  # 공기 확장 계수
+        n_lines = len(center_freq)
+        
+        # 가장 강한 라인 대비 intensity_cutoff 미만인 라인 제외
+        strong = intensity > self.intensity_cutoff * intensity.max(initial=0.0)
+        return center_freq[strong], intensity[strong], gamma_air[strong], n_lines
+    
+    def _line_sum(self, lines, frequency_grid, temperature, pressure, molecular_mass):
+        """단위 농도(몰 분율 1)에서의 라인 합 흡수 계수 (스케일링 팩터 포함)"""
+        center_freq, intensity, gamma_air, _ = lines
+        
+        # 도플러 / 로렌츠 폭 (라인별 배열)
+        gamma_d = self.calculate_doppler_width(center_freq, temperature, molecular_mass)
+        gamma_l = self.calculate_lorentz_width(gamma_air, pressure, temperature)
+        
+        # 라인별 계산 구간: 중심 ± cutoff - 먼 날개는 무시
+        cutoff = self.line_cutoff_widths * np.maximum(gamma_l, gamma_d)
+        
+        # 구간이 격자와 겹치지 않는 라인 제외
+        in_range = (center_freq + cutoff >= frequency_grid[0]) & (center_freq - cutoff <= frequency_grid[-1])
+        center_freq, intensity = center_freq[in_range], intensity[in_range]
+        gamma_l, gamma_d, cutoff = gamma_l[in_range], gamma_d[in_range], cutoff[in_range]
+        
+        weights = intensity * 1e20
+        
+        # GPU 커널은 큰 문제에서만 (처음 필요할 때 CUDA 확인)
+        gpu_kernel = get_voigt_sum_gpu() if len(center_freq) * len(frequency_grid) >= self.gpu_min_work else None
+        if gpu_kernel is not None or _voigt_sum is not None:
+            # numba 커널 (큰 문제는 GPU): 격자 점마다 병렬로 구간 안의 라인만 합산 (Humlicek W4 근사)
+            kernel = gpu_kernel if gpu_kernel is not None else _voigt_sum
+            order = np.argsort(center_freq, kind='stable')
+            unit_absorption = kernel(
+                frequency_grid, center_freq[order], weights[order],
+                gamma_l[order], gamma_d[order], cutoff[order]
+            )
+        else:
+            unit_absorption = self._windowed_voigt_sum(frequency_grid, center_freq, weights, gamma_l, gamma_d, cutoff)
+        
+        return unit_absorption
+    
     def calculate_absorption_spectrum(self, hitran_data, frequency_grid, 
                                    temperature=296.15, pressure=1.0, 
                                    concentration=1000e-6, path_length=1000.0, molecule="H2O"):
@@ -73,8 +235,9 @@ class SpectrumCalculator:
         흡수 스펙트럼 계산
         
         Args:
-            hitran_data: HITRAN 데이터 (astroquery 결과)
-            frequency_grid: 주파수 격자 (cm^-1)
+            hitran_data: HITRAN 데이터 - 'nu', 'sw', 'gamma_air' 열을 가진 객체
+                         (astroquery Table, LineSoA, {이름: 배열} dict 모두 가능)
+            frequency_grid: 주파수 격자 (cm^-1, 오름차순)
             temperature: 온도 (K)
             pressure: 압력 (atm)
             concentration: 농도 (몰 분율)
@@ -87,69 +250,98 @@ class SpectrumCalculator:
         print(f"   농도: {concentration*1e6:.1f} ppm")
         print(f"   경로 길이: {path_length/1000:.1f} km")
         
-        # 전체 흡수 계수 초기화
-        absorption_coeff = np.zeros_like(frequency_grid)
-        
-        # 분자별 분자량 (g/mol)
-        molecular_masses = {
-            "H2O": 18.015,
-            "CO2": 44.01,
-            "CH4": 16.04,
-            "NH3": 17.03,
-            "N2O": 44.01,
-            "CO": 28.01,
-            "O3": 47.998,
-            "SO2": 64.066,
-            "NO2": 46.006,
-            "HNO3": 63.01,
-            "O2": 31.998,
-            "NO": 30.006,
-            "OH": 17.007,
-            "HF": 20.006,
-            "HCl": 36.458,
-            "HBr": 80.912,
-            "HI": 127.912,
-            "ClO": 51.452,
-            "OCS": 60.076,
-            "H2CO": 30.026,
-            "HOCl": 52.460,
-            "N2": 28.014,
-            "HCN": 27.026,
-            "CH3Cl": 50.487,
-            "H2O2": 34.015,
-            "C2H2": 26.037,
-            "C2H6": 30.069,
-            "PH3": 33.998
+        molecular_mass = MOLECULAR_MASSES.get(molecule, 18.015)
+        print(f"   분자량: {molecular_mass} g/mol")
+        
+        # 농도만 바뀌는 반복 계산은 단위 농도 라인 합을 재사용 (라인 데이터·격자·온도·압력이 같을 때)
+        frequency_grid = np.asarray(frequency_grid, dtype=np.float64)
+        key = (id(hitran_data), float(temperature), float(pressure), molecular_mass)
+        cached = self._line_sum_cache.get(key)
+        if cached is not None and cached[0] is hitran_data and np.array_equal(cached[1], frequency_grid):
+            self._line_sum_cache.move_to_end(key)
+            unit_absorption = cached[2]
+            print("   캐시된 라인 합 재사용")
+        else:
+            lines = self._strong_lines(hitran_data)
+            print(f"   라인 수: {len(lines[0])}/{lines[3]} (강도 필터 후)")
+            unit_absorption = self._line_sum(lines, frequency_grid, temperature, pressure, molecular_mass)
+            self._line_sum_cache[key] = (hitran_data, frequency_grid.copy(), unit_absorption)
+            while len(self._line_sum_cache) > self.line_sum_cache_size:
+                self._line_sum_cache.popitem(last=False)
+        
+        # 라인 합 누적은 float32지만 Beer-Lambert 단계는 float64
+        # (float32로는 광학 깊이 ~6e-8 미만이 투과율 1.0으로 반올림 - CRDS의 약한 흡수 영역)
+        absorption_coeff = unit_absorption.astype(np.float64) * concentration
+        
+        # Beer-Lambert 법칙: I = I0 * exp(-alpha * L), 흡광도는 광학 깊이 / ln10
+        optical_depth = absorption_coeff * path_length
+        transmittance = np.exp(-optical_depth)
+        absorbance = optical_depth / np.log(10.0)
+        
+        print(f"✅ {molecule} 스펙트럼 계산 완료!")
+        
+        return {
+            'frequency': frequency_grid,
+            'absorption_coeff': absorption_coeff,
+            'transmittance': transmittance,
+            'absorbance': absorbance
         }
+    
+    def calculate_absorption_spectrum_batch(self, hitran_data, frequency_grid,
+                                            temperatures, pressures, concentrations,
+                                            path_length=1000.0, molecule="H2O", max_workers=None):
+        """
+        여러 층(온도, 압력, 농도 조합)의 흡수 스펙트럼을 한 번에 계산
         
-        molecular_mass = molecular_masses.get(molecule, 18.015)
-        print(f"   분자량: {molecular_mass} g/mol")
+        라인 열 변환과 강도 필터는 모든 층이 공유하고, 층마다 라인 합만 다시 계산
         
-        # 각 HITRAN 라인에 대해 계산
-        for i, line in enumerate(hitran_data):
-            if i % 1000 == 0:
-                print(f"   진행: {i}/{len(hitran_data)} 라인")
-            
-            # 라인 파라미터들
-            center_freq = line['nu']  # 중심 주파수 (cm^-1)
-            intensity = line['sw']    # 선 강도
-            gamma_air = line['gamma_air']  # 공기 확장 계수
-            
-            # 도플러 폭 계산
-            gamma_d = self.calculate_doppler_width(center_freq, temperature, molecular_mass)
-            
-            # 로렌츠 폭 계산
-            gamma_l = self.calculate_lorentz_width(gamma_air, pressure, temperature)
-            
-            # Voigt 프로파일 계산
-            line_shape = self.voigt_profile(frequency_grid, center_freq, gamma_l, gamma_d)
-            
-            # 흡수 계수에 기여 추가 (스케일링 팩터 적용)
-            absorption_coeff += intensity * concentration * line_shape * 1e20
+        Args:
+            hitran_data: HITRAN 데이터 (calculate_absorption_spectrum과 동일)
+            frequency_grid: 주파수 격자 (cm^-1, 오름차순)
+            temperatures: 층별 온도 배열 (K)
+            pressures: 층별 압력 배열 (atm)
+            concentrations: 층별 농도 배열 (몰 분율)
+            path_length: 층 하나의 경로 길이 (m)
+            molecule: 분자 이름
+            max_workers: NumPy 경로에서 층을 나눠 계산할 스레드 수 (None이면 CPU 수)
+        
+        Returns:
+            calculate_absorption_spectrum과 같은 키의 dict - 스펙트럼 값은 (N_layers, N_freq) 행렬
+        """
+        temperatures = np.asarray(temperatures, dtype=np.float64)
+        pressures = np.broadcast_to(np.asarray(pressures, dtype=np.float64), temperatures.shape)
+        concentrations = np.broadcast_to(np.asarray(concentrations, dtype=np.float64), temperatures.shape)
+        frequency_grid = np.asarray(frequency_grid, dtype=np.float64)
+        
+        molecular_mass = MOLECULAR_MASSES.get(molecule, 18.015)
+        print(f"🧮 {molecule} 스펙트럼 계산 중... ({len(temperatures)}개 층)")
+        
+        lines = self._strong_lines(hitran_data)
+        print(f"   라인 수: {len(lines[0])}/{lines[3]} (강도 필터 후)")
+        n_layers = len(temperatures)
+        unit_absorption = np.empty((n_layers, len(frequency_grid)), dtype=np.float32)
+        
+        def layer_sum(i):
+            return self._line_sum(lines, frequency_grid, temperatures[i], pressures[i], molecular_mass)
+        
+        if _voigt_sum is None and n_layers > 1:
+            # NumPy 경로: wofz/bincount가 GIL을 놓으므로 층을 스레드로 나눠 계산
+            # (numba 커널은 격자 축으로 이미 병렬이라 층까지 나누면 코어를 과점유)
+            workers = max_workers or os.cpu_count()
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                for i, row in enumerate(executor.map(layer_sum, range(n_layers))):
+                    unit_absorption[i] = row
+        else:
+            for i in range(n_layers):
+                unit_absorption[i] = layer_sum(i)
+        
+        # Beer-Lambert 단계는 float64 (약한 흡수가 float32 반올림으로 사라지지 않도록)
+        absorption_coeff = unit_absorption.astype(np.float64) * concentrations[:, None]
         
-        # Beer-Lambert 법칙: I = I0 * exp(-alpha * L)
-        transmittance = np.exp(-absorption_coeff * path_length)
-        absorbance = -np.log10(transmittance)
+        # Beer-Lambert 법칙 (층별) - 흡광도는 광학 깊이 / ln10으로 바로 계산
+        optical_depth = absorption_coeff * path_length
+        transmittance = np.exp(-optical_depth)
+        absorbance = optical_depth / np.log(10.0)
         
         print(f"✅ {molecule} 스펙트럼 계산 완료!")
         
@@ -3,51 +3,93 @@ HITRAN 데이터 캐시 관리 모듈
 """
 
 import os
-import pickle
+import json
+import atexit
+import shutil
 import hashlib
-import pandas as pd
+import threading
+import time
+import numpy as np
+from astropy.table import Table, Column
 from datetime import datetime, timedelta
 
+
 class HitranCache:
-    def __init__(self, cache_dir="cache/hitran_cache"):
+    def __init__(self, cache_dir="cache/hitran_cache", flush_every=16):
         self.cache_dir = cache_dir
         
         # 캐시 폴더 생성
         if not os.path.exists(cache_dir):
             os.makedirs(cache_dir)
         
-        # 캐시 메타데이터 파일
+        # 캐시 메타데이터 파일 (변경은 메모리에 모았다가 flush_every회마다 / 종료 시 저장)
         self.metadata_file = os.path.join(cache_dir, "cache_metadata.json")
+        self.flush_every = flush_every
+        self._pending_writes = 0
+        
+        # 메타데이터 변경은 모두 이 잠금 안에서 (병렬 다운로드 스레드가 동시에 접근)
+        self._lock = threading.Lock()
         self.load_metadata()
+        atexit.register(self.flush_metadata)
     
     def load_metadata(self):
-        """캐시 메타데이터 로드"""
+        """캐시 메타데이터 로드 (cache_key → 항목 dict)"""
+        self.metadata = {}
         if os.path.exists(self.metadata_file):
             try:
-                self.metadata = pd.read_json(self.metadata_file)
-            except:
-                self.metadata = pd.DataFrame(columns=['cache_key', 'file_path', 'created_time', 'access_count', 'file_size'])
-        else:
-            self.metadata = pd.DataFrame(columns=['cache_key', 'file_path', 'created_time', 'access_count', 'file_size'])
+                with open(self.metadata_file, 'r', encoding='utf-8') as f:
+                    records = json.load(f)
+                self.metadata = {record['cache_key']: record for record in records}
+            except (OSError, ValueError, KeyError, TypeError):
+                self.metadata = {}
+            
+            # 예전 ISO 문자열 시각은 로드 시 한 번만 epoch 초로 변환 (변환 안 되는 레코드만 제외)
+            for cache_key, record in list(self.metadata.items()):
+                if isinstance(record.get('created_time'), str):
+                    try:
+                        record['created_time'] = int(datetime.fromisoformat(record['created_time']).timestamp())
+                    except ValueError:
+                        del self.metadata[cache_key]
     
     def save_metadata(self):
-        """캐시 메타데이터 저장"""
-        self.metadata.to_json(self.metadata_file, orient='records', date_format='iso')
+        """캐시 메타데이터 저장 (기존과 같은 레코드 배열 JSON)"""
+        with self._lock:
+            self._write_metadata()
+    
+    def flush_metadata(self):
+        """저장되지 않은 변경이 있으면 저장"""
+        with self._lock:
+            if self._pending_writes:
+                self._write_metadata()
+    
+    def _write_metadata(self):
+        """메타데이터 파일 쓰기 (self._lock을 잡은 상태에서 호출)"""
+        with open(self.metadata_file, 'w', encoding='utf-8') as f:
+            json.dump(list(self.metadata.values()), f)
+        self._pending_writes = 0
+    
+    def _metadata_changed(self):
+        """변경 횟수 누적, flush_every회마다 저장 (self._lock을 잡은 상태에서 호출)"""
+        self._pending_writes += 1
+        if self._pending_writes >= self.flush_every:
+            self._write_metadata()
     
     def generate_cache_key(self, molecule, wavelength_min, wavelength_max):
-        """캐시 키 생성"""
-        key_string = f"{molecule}_{wavelength_min}_{wavelength_max}"
-        return hashlib.md5(key_string.encode()).hexdigest()
+        """캐시 키 생성 (파일명으로 안전한 경우 그대로, 아니면 blake2b 해시)"""
+        key_string = f"{molecule}_{float(wavelength_min):.4f}_{float(wavelength_max):.4f}"
+        if all(ch.isalnum() or ch in "._-+" for ch in key_string):
+            return key_string
+        return hashlib.blake2b(key_string.encode(), digest_size=16).hexdigest()
     
     def get_cache_path(self, cache_key):
-        """캐시 파일 경로 생성"""
-        return os.path.join(self.cache_dir, f"{cache_key}.pkl")
+        """캐시 디렉터리 경로 생성 (열마다 .npy 파일 하나 + columns.json)"""
+        return os.path.join(self.cache_dir, cache_key)
     
     def is_cached(self, molecule, wavelength_min, wavelength_max):
         """캐시 존재 여부 확인"""
         cache_key = self.generate_cache_key(molecule, wavelength_min, wavelength_max)
         cache_path = self.get_cache_path(cache_key)
-        return os.path.exists(cache_path)
+        return os.path.exists(os.path.join(cache_path, "columns.json"))
     
     def save_to_cache(self, molecule, wavelength_min, wavelength_max, data):
         """데이터를 캐시에 저장"""
@@ -55,27 +97,34 @@ class HitranCache:
         cache_path = self.get_cache_path(cache_key)
         
         try:
-            # 데이터 저장
-            with open(cache_path, 'wb') as f:
-                pickle.dump(data, f)
+            # 열 단위 .npy로 저장 (로드 시 메모리 맵), 열 순서와 단위는 columns.json에 기록
+            os.makedirs(cache_path, exist_ok=True)
+            columns = []
+            file_size = 0
+            for name in data.colnames:
+                column_path = os.path.join(cache_path, f"{name}.npy")
+                np.save(column_path, np.ma.getdata(data[name]), allow_pickle=False)
+                file_size += os.path.getsize(column_path)
+                unit = data[name].unit
+                columns.append([name, unit.to_string() if unit is not None else None])
             
-            # 메타데이터 업데이트
-            file_size = os.path.getsize(cache_path)
-            new_entry = pd.DataFrame({
-                'cache_key': [cache_key],
-                'file_path': [cache_path],
-                'created_time': [datetime.now().isoformat()],
-                'access_count': [1],
-                'file_size': [file_size],
-                'molecule': [molecule],
-                'wavelength_min': [wavelength_min],
-                'wavelength_max': [wavelength_max]
-            })
+            # 열 목록은 마지막에 기록 (is_cached는 이 파일로 완료 여부 판단)
+            with open(os.path.join(cache_path, "columns.json"), 'w', encoding='utf-8') as f:
+                json.dump(columns, f)
             
-            # 기존 항목 제거 후 추가
-            self.metadata = self.metadata[self.metadata['cache_key'] != cache_key]
-            self.metadata = pd.concat([self.metadata, new_entry], ignore_index=True)
-            self.save_metadata()
+            # 메타데이터 업데이트 (같은 키는 덮어쓰기)
+            with self._lock:
+                self.metadata[cache_key] = {
+                    'cache_key': cache_key,
+                    'file_path': cache_path,
+                    'created_time': int(time.time()),  # epoch 초
+                    'access_count': 1,
+                    'file_size': int(file_size),
+                    'molecule': molecule,
+                    'wavelength_min': float(wavelength_min),
+                    'wavelength_max': float(wavelength_max)
+                }
+                self._metadata_changed()
             
             return True
         except Exception as e:
@@ -88,14 +137,22 @@ class HitranCache:
         cache_path = self.get_cache_path(cache_key)
         
         try:
-            with open(cache_path, 'rb') as f:
-                data = pickle.load(f)
+            with open(os.path.join(cache_path, "columns.json"), 'r', encoding='utf-8') as f:
+                columns = json.load(f)
+            
+            # 열을 메모리 맵으로 열어 복사 없이 Table 구성
+            data = Table([
+                Column(np.load(os.path.join(cache_path, f"{name}.npy"), mmap_mode='r'),
+                       name=name, unit=unit, copy=False)
+                for name, unit in columns
+            ], copy=False)
             
             # 접근 횟수 증가
-            mask = self.metadata['cache_key'] == cache_key
-            if mask.any():
-                self.metadata.loc[mask, 'access_count'] += 1
-                self.save_metadata()
+            with self._lock:
+                entry = self.metadata.get(cache_key)
+                if entry is not None:
+                    entry['access_count'] += 1
+                    self._metadata_changed()
             
             return data
         except Exception as e:
@@ -104,17 +161,20 @@ class HitranCache:
     
     def clean_cache(self, max_age_days=30, max_size_mb=1000):
         """캐시 정리"""
-        current_time = datetime.now()
+        current_time = time.time()
         total_size = 0
         files_to_remove = []
         
-        for _, row in self.metadata.iterrows():
+        with self._lock:
+            entries = [dict(row) for row in self.metadata.values()]
+        
+        for row in entries:
             cache_path = row['file_path']
-            created_time = datetime.fromisoformat(row['created_time'])
+            created_time = row['created_time']
             file_size = row['file_size']
             
-            # 오래된 파일 확인
-            age = (current_time - created_time).days
+            # 오래된 파일 확인 (일 단위)
+            age = (current_time - created_time) // 86400
             if age > max_age_days:
                 files_to_remove.append(row['cache_key'])
                 continue
@@ -124,9 +184,11 @@ class HitranCache:
         # 용량 초과 시 오래된 파일부터 삭제
         if total_size > max_size_mb * 1024 * 1024:
             # 접근 횟수가 적고 오래된 순으로 정렬
-            sorted_metadata = self.metadata.sort_values(['access_count', 'created_time'])
+            sorted_metadata = sorted(
+                entries, key=lambda row: (row['access_count'], row['created_time'])
+            )
             
-            for _, row in sorted_metadata.iterrows():
+            for row in sorted_metadata:
                 if total_size <= max_size_mb * 1024 * 1024:
                     break
                 
@@ -139,35 +201,41 @@ class HitranCache:
             cache_path = self.get_cache_path(cache_key)
             try:
                 if os.path.exists(cache_path):
-                    os.remove(cache_path)
+                    shutil.rmtree(cache_path)
                     removed_count += 1
-            except:
+            except OSError:
                 pass
         
         # 메타데이터에서 제거
-        self.metadata = self.metadata[~self.metadata['cache_key'].isin(files_to_remove)]
-        self.save_metadata()
+        with self._lock:
+            for cache_key in files_to_remove:
+                self.metadata.pop(cache_key, None)
+            self._write_metadata()
         
         return removed_count
     
     def get_cache_stats(self):
         """캐시 통계 정보"""
-        if len(self.metadata) == 0:
+        with self._lock:
+            entries = [dict(entry) for entry in self.metadata.values()]
+        
+        if len(entries) == 0:
             return {
                 'total_files': 0,
                 'total_size_mb': 0,
                 'most_accessed': None,
-                'oldest_file': None
+                'oldest_file': None,
+                'cache_hits': 0
             }
         
-        total_size = self.metadata['file_size'].sum()
-        most_accessed = self.metadata.loc[self.metadata['access_count'].idxmax()]
-        oldest_file = self.metadata.loc[self.metadata['created_time'].idxmin()]
+        total_size = sum(entry.get('file_size', 0) for entry in entries)
+        most_accessed = max(entries, key=lambda entry: entry['access_count'])
+        oldest_file = min(entries, key=lambda entry: entry['created_time'])
         
         return {
-            'total_files': len(self.metadata),
+            'total_files': len(entries),
             'total_size_mb': total_size / (1024 * 1024),
-            'most_accessed': f"{most_accessed['molecule']} ({most_accessed['access_count']}회)",
-            'oldest_file': oldest_file['created_time'],
-            'cache_hits': self.metadata['access_count'].sum()
-        }
\ No newline at end of file
+            'most_accessed': f"{most_accessed.get('molecule')} ({most_accessed['access_count']}회)",
+            'oldest_file': datetime.fromtimestamp(oldest_file['created_time']).isoformat(),
+            'cache_hits': sum(entry['access_count'] for entry in entries)
+        }
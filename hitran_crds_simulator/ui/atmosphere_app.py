@@ -25,6 +25,8 @@ st.set_page_config(
 # Session State 초기화
 if 'atmosphere_results' not in st.session_state:
     st.session_state.atmosphere_results = None
+if 'atmosphere_fig' not in st.session_state:
+    st.session_state.atmosphere_fig = None
 
 st.title("🌍 HITRAN CRDS Atmospheric Profile Simulator")
 st.markdown("**실제 대기 조건을 고려한 스펙트럼 시뮬레이션**")
@@ -35,32 +37,39 @@ def us_standard_atmosphere(altitude_km):
     US Standard Atmosphere (1976) 모델
     
     Args:
-        altitude_km: 고도 (km)
+        altitude_km: 고도 (km), 스칼라 또는 고도 격자 배열
     
     Returns:
-        temperature (K), pressure (Pa), density (kg/m3)
+        temperature (K), pressure (Pa), density (kg/m3) - 입력과 같은 모양의 배열
     """
-    h = altitude_km * 1000  # m 단위로 변환
-    
-    # 대기층별 매개변수
-    if h <= 11000:  # 대류권
-        T = 288.15 - 0.0065 * h
-        P = 101325 * (T / 288.15) ** 5.2561
-    elif h <= 20000:  # 하부 성층권
-        T = 216.65
-        P = 22632 * np.exp(-0.00015769 * (h - 11000))
-    elif h <= 32000:  # 상부 성층권
-        T = 216.65 + 0.001 * (h - 20000)
-        P = 5474.9 * (T / 216.65) ** (-34.163)
-    elif h <= 47000:  # 중간권 하부
-        T = 228.65 + 0.0028 * (h - 32000)
-        P = 868.02 * (T / 228.65) ** (-12.201)
-    elif h <= 51000:  # 중간권 상부
-        T = 270.65
-        P = 110.91 * np.exp(-0.00012622 * (h - 47000))
-    else:  # 열권
-        T = 270.65 - 0.0028 * (h - 51000)
-        P = 66.939 * (T / 270.65) ** 12.201
+    h = np.asarray(altitude_km, dtype=np.float64) * 1000  # m 단위로 변환
+    T = np.empty_like(h)
+    P = np.empty_like(h)
+    
+    # 대기층별 매개변수 (층마다 마스크 하나로 전체 고도 격자를 한 번에 계산)
+    m = h <= 11000  # 대류권
+    T[m] = 288.15 - 0.0065 * h[m]
+    P[m] = 101325 * (T[m] / 288.15) ** 5.2561
+    
+    m = (h > 11000) & (h <= 20000)  # 하부 성층권
+    T[m] = 216.65
+    P[m] = 22632 * np.exp(-0.00015769 * (h[m] - 11000))
+    
+    m = (h > 20000) & (h <= 32000)  # 상부 성층권
+    T[m] = 216.65 + 0.001 * (h[m] - 20000)
+    P[m] = 5474.9 * (T[m] / 216.65) ** (-34.163)
+    
+    m = (h > 32000) & (h <= 47000)  # 중간권 하부
+    T[m] = 228.65 + 0.0028 * (h[m] - 32000)
+    P[m] = 868.02 * (T[m] / 228.65) ** (-12.201)
+    
+    m = (h > 47000) & (h <= 51000)  # 중간권 상부
+    T[m] = 270.65
+    P[m] = 110.91 * np.exp(-0.00012622 * (h[m] - 47000))
+    
+    m = h > 51000  # 열권
+    T[m] = 270.65 - 0.0028 * (h[m] - 51000)
+    P[m] = 66.939 * (T[m] / 270.65) ** 12.201
     
     # 밀도 계산 (이상기체 법칙)
     R = 287.0  # 기체상수 (J/kg/K)
@@ -73,12 +82,9 @@ def tropical_atmosphere(altitude_km):
     T_std, P_std, rho_std = us_standard_atmosphere(altitude_km)
     
     # 열대 지역 보정
-    if altitude_km <= 10:
-        T = T_std + 5  # 지표면 더 따뜻
-        P = P_std * 1.05  # 압력 약간 높음
-    else:
-        T = T_std + 2
-        P = P_std * 0.98
+    low = np.asarray(altitude_km) <= 10
+    T = T_std + np.where(low, 5, 2)  # 지표면 더 따뜻
+    P = P_std * np.where(low, 1.05, 0.98)  # 압력 약간 높음
     
     rho = P / (287.0 * T)
     return T, P, rho
@@ -88,16 +94,188 @@ def polar_atmosphere(altitude_km):
     T_std, P_std, rho_std = us_standard_atmosphere(altitude_km)
     
     # 극지 보정
-    if altitude_km <= 10:
-        T = T_std - 20  # 지표면 더 추움
-        P = P_std * 0.95  # 압력 약간 낮음
-    else:
-        T = T_std - 10
-        P = P_std * 0.92
+    low = np.asarray(altitude_km) <= 10
+    T = T_std - np.where(low, 20, 10)  # 지표면 더 추움
+    P = P_std * np.where(low, 0.95, 0.92)  # 압력 약간 낮음
     
     rho = P / (287.0 * T)
     return T, P, rho
 
+@st.cache_data(ttl=24*60*60, show_spinner=False)
+def get_hitran_data(molecule, wl_min, wl_max):
+    """
+    캐시된 HITRAN 데이터 다운로드 (같은 분자/파장 범위는 하루 동안 재사용)
+    
+    다운로드 실패(None/빈 결과)는 예외로 올려 캐시에 남지 않게 함
+    """
+    data = HitranAPI().download_molecule_data(molecule, wl_min, wl_max)
+    if data is None or len(data) == 0:
+        raise LookupError(f"{molecule} {wl_min}-{wl_max}nm 데이터 없음")
+    return data
+
+@st.cache_data
+def build_atmosphere(model, alt_start, alt_end, num_layers):
+    """
+    캐시된 대기 프로파일 계산
+    
+    Returns:
+        altitudes (km), temperatures (K), pressures (hPa), densities (kg/m3)
+    """
+    altitudes = np.linspace(alt_start, alt_end, num_layers)
+    
+    # 대기 모델별 프로파일 계산 (고도 격자 전체를 한 번에)
+    if model == "Tropical":
+        T, P, rho = tropical_atmosphere(altitudes)
+    elif model == "Polar":
+        T, P, rho = polar_atmosphere(altitudes)
+    else:  # US Standard (1976), Custom은 기본값
+        T, P, rho = us_standard_atmosphere(altitudes)
+    
+    return altitudes, T, P / 100, rho  # Pa to hPa
+
+@st.cache_data(show_spinner=False)
+def profile_csv(altitudes, temperatures, pressures, concentrations, layer_contributions, molecule):
+    """캐시된 대기 프로파일 CSV (결과가 바뀔 때만 다시 직렬화)"""
+    return pd.DataFrame({
+        'Altitude_km': altitudes,
+        'Temperature_K': temperatures,
+        'Pressure_hPa': pressures,
+        f'{molecule}_ppb': concentrations,
+        'Layer_Contribution': layer_contributions
+    }).to_csv(index=False)
+
+@st.cache_data(show_spinner=False)
+def spectrum_csv(wavelength_nm, transmittance, absorbance):
+    """캐시된 전체 스펙트럼 CSV"""
+    return pd.DataFrame({
+        'Wavelength_nm': wavelength_nm,
+        'Transmittance': transmittance,
+        'Absorbance': absorbance
+    }).to_csv(index=False)
+
+@st.cache_resource
+def get_calculator():
+    """재실행 사이에 공유하는 스펙트럼 계산기 (한 번만 생성)"""
+    return SpectrumCalculator()
+
+def decimate_trace(x, y, target=800):
+    """
+    그래프용 점 수 축소 (min-max 구간 방식)
+    
+    구간마다 최솟값/최댓값 점만 남겨 좁은 흡수선의 깊이를 유지하면서 약 target개로 줄임
+    """
+    n = len(y)
+    if n <= target:
+        return x, y
+    
+    bin_size = int(np.ceil(n / (target // 2)))
+    n_full = n // bin_size * bin_size
+    blocks = y[:n_full].reshape(-1, bin_size)
+    offsets = np.arange(0, n_full, bin_size)
+    keep = np.unique(np.concatenate([
+        offsets + blocks.argmin(axis=1),
+        offsets + blocks.argmax(axis=1),
+        np.arange(n_full, n)  # 마지막 불완전 구간은 그대로
+    ]))
+    return x[keep], y[keep]
+
+def build_atmosphere_figure(results):
+    """대기 프로파일 결과의 4분할 그래프 생성 (결과가 바뀔 때만 호출)"""
+    fig = make_subplots(
+        rows=2, cols=2,
+        subplot_titles=('대기 프로파일', '농도 프로파일', '층별 기여도', '전체 스펙트럼'),
+        specs=[[{"secondary_y": True}, {"secondary_y": False}],
+               [{"secondary_y": False}, {"secondary_y": False}]]
+    )
+    
+    # 1. 대기 프로파일 (온도, 압력)
+    fig.add_trace(
+        go.Scatter(
+            x=results['temperatures'],
+            y=results['altitudes'],
+            mode='lines',
+            name='온도 (K)',
+            line=dict(color='red', width=2)
+        ),
+        row=1, col=1
+    )
+    
+    fig.add_trace(
+        go.Scatter(
+            x=results['pressures'],
+            y=results['altitudes'],
+            mode='lines',
+            name='압력 (hPa)',
+            line=dict(color='blue', width=2)
+        ),
+        row=1, col=1, secondary_y=True
+    )
+    
+    # 2. 농도 프로파일
+    fig.add_trace(
+        go.Scatter(
+            x=results['concentrations'],
+            y=results['altitudes'],
+            mode='lines',
+            name=f'{results["settings"]["molecule"]} (ppb)',
+            line=dict(color='green', width=2),
+            showlegend=False
+        ),
+        row=1, col=2
+    )
+    
+    # 3. 층별 기여도 (최대 흡광도)
+    layer_contributions = results['layer_contributions']
+    
+    fig.add_trace(
+        go.Scatter(
+            x=layer_contributions,
+            y=results['altitudes'],
+            mode='lines+markers',
+            name='층별 기여도',
+            line=dict(color='orange', width=2),
+            marker=dict(size=4),
+            showlegend=False
+        ),
+        row=2, col=1
+    )
+    
+    # 4. 전체 스펙트럼 (표시용으로 점 수 축소, CSV는 전체 해상도 유지)
+    wavelength_plot, transmittance_plot = decimate_trace(
+        results['wavelength_nm'], results['total_transmittance']
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=wavelength_plot,
+            y=transmittance_plot,
+            mode='lines',
+            name='투과율',
+            line=dict(color='purple', width=2),
+            showlegend=False
+        ),
+        row=2, col=2
+    )
+    
+    # 레이아웃 설정
+    fig.update_layout(height=800, showlegend=True)
+    
+    # x축 제목
+    fig.update_xaxes(title_text="온도 (K)", row=1, col=1)
+    fig.update_xaxes(title_text=f"{results['settings']['molecule']} (ppb)", row=1, col=2)
+    fig.update_xaxes(title_text="최대 흡광도", row=2, col=1)
+    fig.update_xaxes(title_text="파장 (nm)", row=2, col=2)
+    
+    # y축 제목
+    fig.update_yaxes(title_text="고도 (km)", row=1, col=1)
+    fig.update_yaxes(title_text="고도 (km)", row=1, col=2)
+    fig.update_yaxes(title_text="고도 (km)", row=2, col=1)
+    fig.update_yaxes(title_text="투과율", row=2, col=2)
+    
+    # 이차 y축 제목
+    fig.update_yaxes(title_text="압력 (hPa)", row=1, col=1, secondary_y=True)
+    
+    return fig
+
 # 사이드바 설정
 st.sidebar.header("🌍 대기 조건 설정")
 
@@ -141,6 +319,11 @@ with col1:
 with col2:
     wavelength_max = st.number_input("최대 파장 (nm)", value=1520, min_value=100, max_value=10000)
 
+# 주파수 격자 점 수 상한 (2의 거듭제곱 - FFT 기반 후처리에 유리)
+spectral_points = st.sidebar.select_slider(
+    "분광 해상도 (points)", options=[512, 1024, 2048, 4096], value=2048
+)
+
 # 농도 프로파일
 st.sidebar.subheader("🌫️ 농도 프로파일")
 concentration_type = st.sidebar.selectbox(
@@ -168,6 +351,7 @@ calculate_button = st.sidebar.button("🧮 대기 프로파일 계산", type="pr
 if st.session_state.atmosphere_results:
     if st.sidebar.button("🗑️ 결과 초기화"):
         st.session_state.atmosphere_results = None
+        st.session_state.atmosphere_fig = None
         st.rerun()
 
 # 메인 화면
@@ -181,6 +365,7 @@ with col2:
     st.write(f"**경로 타입:** {path_type}")
     st.write(f"**분자:** {molecule}")
     st.write(f"**파장 범위:** {wavelength_min}-{wavelength_max} nm")
+    st.write(f"**분광 해상도:** 최대 {spectral_points} points")
     st.write(f"**농도 분포:** {concentration_type}")
 
 # 계산 실행
@@ -199,59 +384,42 @@ with col1:
                 status_text.text("🌍 대기 프로파일 생성 중...")
                 progress_bar.progress(20)
                 
-                # 고도 격자 생성
+                # 고도 격자와 대기 모델별 프로파일 (모델/고도 범위가 같으면 캐시 재사용)
                 num_layers = 50
-                altitudes = np.linspace(altitude_start, altitude_end, num_layers)
-                
-                # 대기 모델별 프로파일 계산
-                temperatures = []
-                pressures = []
-                densities = []
-                
-                for alt in altitudes:
-                    if atmosphere_model == "US Standard (1976)":
-                        T, P, rho = us_standard_atmosphere(alt)
-                    elif atmosphere_model == "Tropical":
-                        T, P, rho = tropical_atmosphere(alt)
-                    elif atmosphere_model == "Polar":
-                        T, P, rho = polar_atmosphere(alt)
-                    else:  # Custom
-                        T, P, rho = us_standard_atmosphere(alt)  # 기본값
-                    
-                    temperatures.append(T)
-                    pressures.append(P / 100)  # Pa to hPa
-                    densities.append(rho)
+                altitudes, temperatures, pressures, densities = build_atmosphere(
+                    atmosphere_model, altitude_start, altitude_end, num_layers
+                )
                 
                 # 2. 농도 프로파일 생성
                 status_text.text("🌫️ 농도 프로파일 생성 중...")
                 progress_bar.progress(40)
                 
-                concentrations = []
-                for alt in altitudes:
-                    if concentration_type == "균일 분포":
-                        conc = base_concentration
-                    elif concentration_type == "지수 감소":
-                        conc = surface_concentration * np.exp(-alt / scale_height)
-                    else:  # 실제 프로파일
-                        if molecule == "H2O":
-                            conc = 10000 * np.exp(-alt / 2.0)  # 수증기는 빠르게 감소
-                        elif molecule == "CO2":
-                            conc = 400000 * (1 - 0.1 * alt / 50)  # 약간 감소
-                        elif molecule == "CH4":
-                            conc = 1800 * np.exp(-alt / 8.0)  # 메탄은 천천히 감소
-                        else:
-                            conc = 1000 * np.exp(-alt / 5.0)  # 기본값
-                    
-                    concentrations.append(max(conc, 0.1))  # 최소값 제한
+                if concentration_type == "균일 분포":
+                    concentrations = np.full_like(altitudes, base_concentration)
+                elif concentration_type == "지수 감소":
+                    concentrations = surface_concentration * np.exp(-altitudes / scale_height)
+                else:  # 실제 프로파일
+                    if molecule == "H2O":
+                        concentrations = 10000 * np.exp(-altitudes / 2.0)  # 수증기는 빠르게 감소
+                    elif molecule == "CO2":
+                        concentrations = 400000 * (1 - 0.1 * altitudes / 50)  # 약간 감소
+                    elif molecule == "CH4":
+                        concentrations = 1800 * np.exp(-altitudes / 8.0)  # 메탄은 천천히 감소
+                    else:
+                        concentrations = 1000 * np.exp(-altitudes / 5.0)  # 기본값
+                
+                concentrations = np.maximum(concentrations, 0.1)  # 최소값 제한
                 
                 # 3. HITRAN 데이터 다운로드
                 status_text.text("📥 HITRAN 데이터 다운로드 중...")
                 progress_bar.progress(60)
                 
-                hitran_api = HitranAPI()
-                hitran_data = hitran_api.download_molecule_data(molecule, wavelength_min, wavelength_max)
+                try:
+                    hitran_data = get_hitran_data(molecule, wavelength_min, wavelength_max)
+                except LookupError:
+                    hitran_data = None  # 실패는 캐시되지 않으므로 다음 계산에서 다시 시도
                 
-                if hitran_data is None or len(hitran_data) == 0:
+                if hitran_data is None:
                     st.error(f"❌ {molecule} 데이터를 찾을 수 없습니다!")
                 else:
                     # 4. 층별 스펙트럼 계산
@@ -260,62 +428,53 @@ with col1:
                     # 주파수 격자
                     freq_min = 1e7 / wavelength_max
                     freq_max = 1e7 / wavelength_min
-                    frequency_grid = np.linspace(freq_min, freq_max, 2000)  # 해상도 낮춤 (속도 향상)
+                    # 목표 간격 0.01 cm^-1에 필요한 점 수를 2의 거듭제곱으로 올리고 512 ~ 선택한 해상도로 제한
+                    # (좁은 범위는 적은 점으로 충분 - 계산량은 층 수 × 점 수 × 라인 수에 비례)
+                    target_resolution = 0.01  # cm^-1
+                    needed_points = max((freq_max - freq_min) / target_resolution, 1.0)
+                    num_freq = int(np.clip(2 ** np.ceil(np.log2(needed_points)), 512, spectral_points))
+                    frequency_grid = np.linspace(freq_min, freq_max, num_freq)
                     wavelength_nm = 1e7 / frequency_grid
                     
-                    calc = SpectrumCalculator()
-                    
-                    # 층별 계산
-                    layer_spectra = []
-                    total_absorption = np.zeros_like(frequency_grid)
+                    calc = get_calculator()
                     
                     layer_thickness = 1000  # 1km 두께
                     
-                    for i, (alt, T, P_hPa, conc) in enumerate(zip(altitudes, temperatures, pressures, concentrations)):
-                        if i % 10 == 0:
-                            progress = 60 + int((i / len(altitudes)) * 30)
-                            progress_bar.progress(progress)
-                        
-                        # 층별 스펙트럼 계산
-                        spectrum = calc.calculate_absorption_spectrum(
-                            hitran_data=hitran_data,
-                            frequency_grid=frequency_grid,
-                            temperature=T,
-                            pressure=P_hPa / 760.0,  # hPa to atm
-                            concentration=conc / 1e9,  # ppb to 몰분율
-                            path_length=layer_thickness,  # 1km 층 두께
-                            molecule=molecule
-                        )
-                        
-                        layer_spectra.append({
-                            'altitude': alt,
-                            'temperature': T,
-                            'pressure': P_hPa,
-                            'concentration': conc,
-                            'spectrum': spectrum
-                        })
-                        
-                        # 총 흡수에 누적
-                        total_absorption += spectrum['absorption_coeff'] * layer_thickness
+                    # 모든 층을 한 번에 계산 - 결과는 (층 수, 주파수 점 수) 행렬
+                    layers = calc.calculate_absorption_spectrum_batch(
+                        hitran_data=hitran_data,
+                        frequency_grid=frequency_grid,
+                        temperatures=temperatures,
+                        pressures=pressures / 760.0,  # hPa to atm
+                        concentrations=concentrations / 1e9,  # ppb to 몰분율
+                        path_length=layer_thickness,  # 1km 층 두께
+                        molecule=molecule
+                    )
+                    
+                    # 총 흡수 (층 축으로 합산)
+                    total_absorption = layers['absorption_coeff'].sum(axis=0, dtype=np.float64) * layer_thickness
+                    layer_contributions = layers['absorbance'].max(axis=1)
                     
                     # 5. 전체 투과율 계산
                     status_text.text("📊 전체 투과율 계산 중...")
                     progress_bar.progress(90)
                     
                     total_transmittance = np.exp(-total_absorption)
-                    total_absorbance = -np.log10(total_transmittance)
+                    total_absorbance = total_absorption * (1.0 / np.log(10.0))  # -log10(exp(-x)) = x / ln10
                     
                     progress_bar.progress(100)
                     status_text.text("✅ 대기 프로파일 계산 완료!")
                     
                     # 결과 저장
+                    st.session_state.atmosphere_fig = None
                     st.session_state.atmosphere_results = {
                         'altitudes': altitudes,
                         'temperatures': temperatures,
                         'pressures': pressures,
                         'concentrations': concentrations,
                         'wavelength_nm': wavelength_nm,
-                        'layer_spectra': layer_spectra,
+                        'absorption_matrix': layers['absorption_coeff'],  # (층 수, 주파수 점 수)
+                        'layer_contributions': layer_contributions,
                         'total_transmittance': total_transmittance,
                         'total_absorbance': total_absorbance,
                         'settings': {
@@ -339,96 +498,11 @@ if st.session_state.atmosphere_results:
     with col1:
         st.subheader("🌍 대기 프로파일 결과")
         
-        # 4분할 그래프
-        fig = make_subplots(
-            rows=2, cols=2,
-            subplot_titles=('대기 프로파일', '농도 프로파일', '층별 기여도', '전체 스펙트럼'),
-            specs=[[{"secondary_y": True}, {"secondary_y": False}],
-                   [{"secondary_y": False}, {"secondary_y": False}]]
-        )
-        
-        # 1. 대기 프로파일 (온도, 압력)
-        fig.add_trace(
-            go.Scatter(
-                x=results['temperatures'],
-                y=results['altitudes'],
-                mode='lines',
-                name='온도 (K)',
-                line=dict(color='red', width=2)
-            ),
-            row=1, col=1
-        )
-        
-        fig.add_trace(
-            go.Scatter(
-                x=results['pressures'],
-                y=results['altitudes'],
-                mode='lines',
-                name='압력 (hPa)',
-                line=dict(color='blue', width=2)
-            ),
-            row=1, col=1, secondary_y=True
-        )
-        
-        # 2. 농도 프로파일
-        fig.add_trace(
-            go.Scatter(
-                x=results['concentrations'],
-                y=results['altitudes'],
-                mode='lines',
-                name=f'{results["settings"]["molecule"]} (ppb)',
-                line=dict(color='green', width=2),
-                showlegend=False
-            ),
-            row=1, col=2
-        )
-        
-        # 3. 층별 기여도 (최대 흡광도)
-        layer_contributions = [np.max(layer['spectrum']['absorbance']) for layer in results['layer_spectra']]
-        
-        fig.add_trace(
-            go.Scatter(
-                x=layer_contributions,
-                y=results['altitudes'],
-                mode='lines+markers',
-                name='층별 기여도',
-                line=dict(color='orange', width=2),
-                marker=dict(size=4),
-                showlegend=False
-            ),
-            row=2, col=1
-        )
-        
-        # 4. 전체 스펙트럼
-        fig.add_trace(
-            go.Scatter(
-                x=results['wavelength_nm'],
-                y=results['total_transmittance'],
-                mode='lines',
-                name='투과율',
-                line=dict(color='purple', width=2),
-                showlegend=False
-            ),
-            row=2, col=2
-        )
-        
-        # 레이아웃 설정
-        fig.update_layout(height=800, showlegend=True)
-        
-        # x축 제목
-        fig.update_xaxes(title_text="온도 (K)", row=1, col=1)
-        fig.update_xaxes(title_text=f"{results['settings']['molecule']} (ppb)", row=1, col=2)
-        fig.update_xaxes(title_text="최대 흡광도", row=2, col=1)
-        fig.update_xaxes(title_text="파장 (nm)", row=2, col=2)
-        
-        # y축 제목
-        fig.update_yaxes(title_text="고도 (km)", row=1, col=1)
-        fig.update_yaxes(title_text="고도 (km)", row=1, col=2)
-        fig.update_yaxes(title_text="고도 (km)", row=2, col=1)
-        fig.update_yaxes(title_text="투과율", row=2, col=2)
-        
-        # 이차 y축 제목
-        fig.update_yaxes(title_text="압력 (hPa)", row=1, col=1, secondary_y=True)
+        # 4분할 그래프: 세션에 저장된 그래프 재사용 (새 결과가 나올 때만 다시 생성)
+        if st.session_state.atmosphere_fig is None:
+            st.session_state.atmosphere_fig = build_atmosphere_figure(results)
+        fig = st.session_state.atmosphere_fig
+        layer_contributions = results['layer_contributions']
         
         st.plotly_chart(fig, use_container_width=True)
         
@@ -452,17 +526,14 @@ if st.session_state.atmosphere_results:
         # 층별 상세 정보
         st.subheader("📋 층별 상세 정보")
         
-        layer_summary = []
-        for i, layer in enumerate(results['layer_spectra'][::5]):  # 5개마다 표시
-            layer_summary.append({
-                '고도 (km)': f"{layer['altitude']:.1f}",
-                '온도 (K)': f"{layer['temperature']:.1f}",
-                '압력 (hPa)': f"{layer['pressure']:.1f}",
-                '농도 (ppb)': f"{layer['concentration']:.1f}",
-                '최대 흡광도': f"{np.max(layer['spectrum']['absorbance']):.4f}"
-            })
-        
-        summary_df = pd.DataFrame(layer_summary)
+        every = slice(None, None, 5)  # 5개마다 표시
+        summary_df = pd.DataFrame({
+            '고도 (km)': np.char.mod('%.1f', results['altitudes'][every]),
+            '온도 (K)': np.char.mod('%.1f', results['temperatures'][every]),
+            '압력 (hPa)': np.char.mod('%.1f', results['pressures'][every]),
+            '농도 (ppb)': np.char.mod('%.1f', results['concentrations'][every]),
+            '최대 흡광도': np.char.mod('%.4f', layer_contributions[every])
+        })
         st.dataframe(summary_df, use_container_width=True)
         
         # 데이터 내보내기
@@ -472,38 +543,23 @@ if st.session_state.atmosphere_results:
         
         with col_down1:
             # 대기 프로파일 CSV
-            profile_data = {
-                'Altitude_km': results['altitudes'],
-                'Temperature_K': results['temperatures'],
-                'Pressure_hPa': results['pressures'],
-                f'{results["settings"]["molecule"]}_ppb': results['concentrations'],
-                'Layer_Contribution': layer_contributions
-            }
-            
-            profile_df = pd.DataFrame(profile_data)
-            profile_csv = profile_df.to_csv(index=False)
-            
             st.download_button(
                 label="🌍 대기 프로파일 (CSV)",
-                data=profile_csv,
+                data=profile_csv(
+                    results['altitudes'], results['temperatures'], results['pressures'],
+                    results['concentrations'], layer_contributions, results['settings']['molecule']
+                ),
                 file_name=f"atmosphere_profile_{results['settings']['atmosphere_model']}_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
                 mime="text/csv"
             )
         
         with col_down2:
             # 전체 스펙트럼 CSV
-            spectrum_data = {
-                'Wavelength_nm': results['wavelength_nm'],
-                'Transmittance': results['total_transmittance'],
-                'Absorbance': results['total_absorbance']
-            }
-            
-            spectrum_df = pd.DataFrame(spectrum_data)
-            spectrum_csv = spectrum_df.to_csv(index=False)
-            
             st.download_button(
                 label="📊 전체 스펙트럼 (CSV)",
-                data=spectrum_csv,
+                data=spectrum_csv(
+                    results['wavelength_nm'], results['total_transmittance'], results['total_absorbance']
+                ),
                 file_name=f"atmosphere_spectrum_{results['settings']['molecule']}_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
                 mime="text/csv"
             )